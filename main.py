@@ -49,6 +49,14 @@ def route_change(route: ft.RouteChangeEvent):
     page = route.page
     target_route = route.route
 
+    # 记录当前正在查看的控制台，处理循环只为它推送UI更新
+    if target_route == "/console":
+        app_state.active_console_id = "mmc"
+    elif target_route.startswith("/adapters/") and len(target_route.split("/")) == 3:
+        app_state.active_console_id = target_route.split("/")[2]
+    else:
+        app_state.active_console_id = None
+
     # 清空页面
     page.views.clear()
 
@@ -232,14 +240,14 @@ def main(page: ft.Page):
 
         # --- 步骤 3: 加载特定于 MMC 的配置 (不创建文件/目录) ---
         # Bot 配置
-        app_state.bot_config = load_config(config_type="bot", base_dir=mmc_path)
+        app_state.bot_config = load_config(config_type="bot", base_dir=mmc_path, read_only=True)
         if not app_state.bot_config:
             logger.warning(f"未找到Bot配置文件 (期望路径: {mmc_path / 'config' / 'bot_config.toml'}) 或加载失败。")
         else:
             logger.info(f"Bot配置从 {mmc_path / 'config' / 'bot_config.toml'} 加载成功。")
             
         # LPMM 配置
-        app_state.lpmm_config = load_config(config_type="lpmm", base_dir=mmc_path)
+        app_state.lpmm_config = load_config(config_type="lpmm", base_dir=mmc_path, read_only=True)
         if not app_state.lpmm_config:
             logger.warning(f"未找到LPMM配置文件 (期望路径: {mmc_path / 'config' / 'lpmm_config.toml'}) 或加载失败。")
         else:
@@ -270,6 +278,7 @@ def main(page: ft.Page):
         # --- 其他UI和应用状态设置 ---
         # 使用 app_state.gui_config, app_state.bot_config 等进行后续设置
         app_state.adapter_paths = app_state.gui_config.get("adapters", []).copy()
+        app_state.debug_metrics_enabled = bool(app_state.gui_config.get("debug_metrics", False))
         logger.info(f"从GUI配置加载的适配器路径: {app_state.adapter_paths}")
 
         python_path_from_config = app_state.gui_config.get("python_path")
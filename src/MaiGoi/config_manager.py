@@ -3,11 +3,25 @@ from loguru import logger
 import tomlkit
 from pathlib import Path
 import os
+import sys
 from typing import Dict, Any, Optional, List, Tuple, Union
 import logging
 from datetime import datetime
 import shutil
+import hashlib
 
+# 只读加载 (read_only=True) 时优先使用原生扩展实现的 TOML 解析器，
+# 都不可用时回退到 tomlkit。需要写回的配置必须用 tomlkit 解析，否则保存时会丢失注释和格式
+try:
+    import rtoml as _fast_toml
+except ImportError:
+    try:
+        import pytomlpp as _fast_toml
+    except ImportError:
+        try:
+            import tomllib as _fast_toml  # Python 3.11+
+        except ImportError:
+            _fast_toml = None
 
 CONFIG_DIR = Path("config")
 # Define default filenames for different config types
@@ -23,6 +37,47 @@ DEFAULT_GUI_CONFIG = {
 # 全局变量跟踪已使用的配置路径
 LAST_USED_CONFIG_PATHS = {}
 
+# 每个配置文件最近一次加载/保存时的 (内容摘要, st_mtime_ns, st_size)。
+# 保存的内容没有变化、且磁盘上的文件自那以后未被改动时跳过写入 (连同备份)
+_LAST_WRITTEN_DIGESTS: Dict[str, Tuple[bytes, int, int]] = {}
+
+
+def _content_digest(content: str) -> bytes:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+def intern_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    原地把嵌套 dict (包括列表中的 dict) 的所有键换成 sys.intern 后的字符串，返回 data 本身。
+
+    各个表里反复出现的键 (如元数据的 describe/important/can_edit) 因此只保留一份，
+    字典查找也能走指针相等的快速路径。只用于普通 dict；tomlkit 文档的键由其内部的 Key 对象管理，不能这样替换。
+    """
+    stack: List[Any] = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            items = list(node.items())
+            node.clear()
+            for key, value in items:
+                node[sys.intern(key)] = value
+                if isinstance(value, (dict, list)):
+                    stack.append(value)
+        else:
+            stack.extend(value for value in node if isinstance(value, (dict, list)))
+    return data
+
+def loads_read_only(content: str) -> Dict[str, Any]:
+    """
+    把 TOML 文本解析为普通 dict (键已驻留)，只用于读取。
+
+    有原生扩展实现的解析器时用它，否则用 tomlkit 解析后 unwrap。结果不保留注释和格式，不能交给 save_config 写回。
+    """
+    if _fast_toml is not None:
+        data = _fast_toml.loads(content)
+    else:
+        data = tomlkit.parse(content).unwrap()
+    return intern_keys(data)
+
 # 定义可能的配置类型
 CONFIG_TYPES = {
     "bot": "bot_config.toml",  # 机器人核心配置
@@ -97,27 +152,49 @@ def get_config_path(config_type: str, base_dir: Optional[Union[str, Path]] = Non
     return config_path
 
 
-def load_config(config_type: str, base_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
-    """加载指定类型的配置文件，返回TOML字典"""
+def load_config(config_type: str, base_dir: Optional[Union[str, Path]] = None, read_only: bool = False) -> Dict[str, Any]:
+    """
+    加载指定类型的配置文件，返回TOML字典
+
+    read_only=True 时返回普通 dict (见 loads_read_only，可用时由原生解析器解析，速度快得多)，
+    只适合读取，不能再交给 save_config 写回，否则会丢失注释和格式。
+    """
+    parse = loads_read_only if read_only else tomlkit.parse
     config_path = get_config_path(config_type, base_dir)
     logger.debug(f"尝试加载配置: {config_path}")
     
-    # 检查文件是否存在
-    if not config_path.exists():
+    # 一次性读入整个文件，之后每种编码只在内存中解码，不再重复打开和读取
+    # 不预先 exists() 检查：直接打开，文件不存在时由 FileNotFoundError 判断，少一次 stat
+    try:
+        with open(config_path, "rb") as f:
+            # 读取前记下文件状态；读取期间被改动时状态不再匹配，之后的保存不会被跳过
+            file_stat = os.fstat(f.fileno())
+            raw_content = f.read()
+    except FileNotFoundError:
         logger.warning(f"配置文件不存在: {config_path}")
         # 返回空配置而不是引发错误，以便应用程序可以继续
         return {}
-    
-    # 尝试多种编码方式读取文件
+    except Exception as read_error:
+        logger.error(f"读取配置文件失败: {read_error}")
+        return {}
+
+    # 尝试多种编码方式解码文件
     encodings_to_try = ['utf-8', 'utf-8-sig', 'gbk', 'gb2312', 'latin-1']
     for encoding in encodings_to_try:
         try:
-            with open(config_path, "r", encoding=encoding) as f:
-                config_content = f.read()
+            config_content = raw_content.decode(encoding)
+            # 与文本模式 open() 的通用换行一致，统一为 \n
+            if "\r" in config_content:
+                config_content = config_content.replace("\r\n", "\n").replace("\r", "\n")
                 
             # 尝试解析TOML内容
             try:
-                config_data = tomlkit.parse(config_content)
+                config_data = parse(config_content)
+                if parse is tomlkit.parse:
+                    # tomlkit 可无损往返，记下内容摘要，原样保存时可以直接跳过
+                    _LAST_WRITTEN_DIGESTS[str(config_path)] = (
+                        _content_digest(config_content), file_stat.st_mtime_ns, file_stat.st_size
+                    )
                 logger.info(f"成功加载配置: {config_path} (使用编码: {encoding})")
                 return config_data
             except Exception as parse_error:
@@ -125,7 +202,7 @@ def load_config(config_type: str, base_dir: Optional[Union[str, Path]] = None) -
                 continue
                 
         except Exception as read_error:
-            logger.warning(f"读取配置文件失败 ({encoding}): {read_error}")
+            logger.warning(f"解码配置文件失败 ({encoding}): {read_error}")
             continue
     
     # 如果所有编码都失败
@@ -140,25 +217,56 @@ def save_config(config_data: Dict[str, Any], config_type: str,
     config_path = get_config_path(config_type, base_dir)
     logger.debug(f"尝试保存配置: {config_path}")
     
+    # 先序列化一次；内容与上次加载/保存时一致、且文件在磁盘上未被外部改动时就不写文件，也不产生新的备份
+    try:
+        content = tomlkit.dumps(config_data)
+    except Exception as e:
+        logger.error(f"序列化配置失败: {e}")
+        return False
+    digest = _content_digest(content)
+    digest_key = str(config_path)
+    last_written = _LAST_WRITTEN_DIGESTS.get(digest_key)
+    if last_written is not None and last_written[0] == digest:
+        # 一次 stat 同时确认文件仍存在且未被外部修改
+        try:
+            file_stat = os.stat(config_path)
+        except OSError:
+            file_stat = None
+        if file_stat is not None and (file_stat.st_mtime_ns, file_stat.st_size) == last_written[1:]:
+            logger.debug(f"配置内容未变化，跳过保存: {config_path}")
+            return True
+
     # 创建配置目录（如果不存在）
     config_path.parent.mkdir(exist_ok=True, parents=True)
     
-    # 备份现有文件（如果存在且启用了备份）
-    if backup and config_path.exists():
+    # 备份现有文件（如果存在且启用了备份）；同样直接复制，文件不存在时跳过
+    if backup:
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         backup_path = config_path.with_name(f"{config_path.stem}_{timestamp}.bak")
         try:
             shutil.copy2(config_path, backup_path)
             logger.info(f"已创建配置备份: {backup_path}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.warning(f"创建配置备份失败: {e}")
     
-    # 保存新配置
+    # 保存新配置：先写临时文件再 os.replace，写到一半出错也不会留下残缺的配置文件
+    tmp_path = config_path.with_name(config_path.name + ".tmp")
     try:
-        with open(config_path, "w", encoding="utf-8") as f:
-            tomlkit.dump(config_data, f)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            # os.replace 保留 inode 和 mtime，写完即可取得替换后文件的状态
+            file_stat = os.fstat(f.fileno())
+        os.replace(tmp_path, config_path)
+        _LAST_WRITTEN_DIGESTS[digest_key] = (digest, file_stat.st_mtime_ns, file_stat.st_size)
         logger.info(f"已成功保存配置: {config_path}")
         return True
     except Exception as e:
         logger.error(f"保存配置失败: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
         return False
@@ -4,11 +4,13 @@ import os
 import sys
 import platform
 import threading
-import queue
 import traceback
 import asyncio
+import codecs
+import functools
 import psutil
 import time
+from collections import deque
 from typing import Optional, TYPE_CHECKING, Tuple
 from loguru import logger
 
@@ -16,8 +18,27 @@ from loguru import logger
 from .color_parser import parse_log_line_to_spans
 
 if TYPE_CHECKING:
-    from .state import AppState
-from .utils import show_snackbar, update_page_safe  # Add import here
+    from .state import AppState, ManagedProcessState, OutputBuffer
+from .utils import show_snackbar, update_page_safe, call_in_page_loop  # Add import here
+
+# 平台信息在导入时确定一次，避免各代码路径重复调用 platform.system()
+_SYSTEM = platform.system()
+_IS_WINDOWS = _SYSTEM == "Windows"
+_IS_MAC = _SYSTEM == "Darwin"
+_CREATE_NO_WINDOW = subprocess.CREATE_NO_WINDOW if _IS_WINDOWS else 0
+
+# 子进程在线程池中用 Popen 创建，再把 stdout 管道交给事件循环读取。
+# Windows 的 Proactor 循环只能异步读取重叠 I/O 管道，使用 asyncio 自带的、以重叠管道创建的 Popen
+if _IS_WINDOWS:
+    from asyncio.windows_utils import Popen as _PipePopen
+else:
+    _PipePopen = subprocess.Popen
+
+# 复用同一个 psutil.Process 对象，避免每次采样都重新构造
+_SELF_PROC = psutil.Process(os.getpid())
+
+# 标记由处理循环创建的日志行控件，只有这些控件会被回收复用（状态提示行带有 italic 等其它样式）
+_LOG_LINE_TAG = "log_line"
 
 # --- Helper Function to Update Button States (Mostly Unchanged for now) --- #
 
@@ -32,7 +53,7 @@ def update_buttons_state(page: Optional[ft.Page], app_state: "AppState", is_runn
     # stop_action = lambda _: stop_bot_process(page, app_state) if page else None # stop_bot_process now calls stop_managed_process
     def _start_action(_):
         if page:
-            start_bot_and_show_console(page, app_state)
+            page.run_task(start_bot_and_show_console, page, app_state)
 
     def _stop_action(_):
         if page:
@@ -126,6 +147,8 @@ def cleanup_on_exit(app_state: "AppState"):
     process_ids = list(app_state.managed_processes.keys())
     logger.info(f"[atexit Cleanup] Found managed process IDs: {process_ids}")
 
+    # 第一轮：向所有进程发送 terminate，不逐个等待
+    procs_to_reap = []
     for process_id in process_ids:
         process_state = app_state.managed_processes.get(process_id)
         if process_state and process_state.pid:
@@ -133,18 +156,10 @@ def cleanup_on_exit(app_state: "AppState"):
             try:
                 # Use psutil directly as handles might be invalid in atexit
                 if psutil.pid_exists(process_state.pid):
-                    logger.info(
-                        f"[atexit Cleanup] PID {process_state.pid} exists. Attempting termination/kill..."
-                    )
+                    logger.info(f"[atexit Cleanup] PID {process_state.pid} exists. Sending terminate...")
                     proc = psutil.Process(process_state.pid)
                     proc.terminate()
-                    try:
-                        proc.wait(timeout=0.5)
-                    except psutil.TimeoutExpired:
-                        proc.kill()
-                    logger.info(
-                        f"[atexit Cleanup] psutil terminate/kill signal sent for PID {process_state.pid}."
-                    )
+                    procs_to_reap.append(proc)
                 else:
                     logger.info(f"[atexit Cleanup] PID {process_state.pid} does not exist.")
             except psutil.NoSuchProcess:
@@ -155,6 +170,18 @@ def cleanup_on_exit(app_state: "AppState"):
             logger.info(f"[atexit Cleanup] Process ID '{process_id}' has no PID stored.")
         # else: Process ID might have been removed already
 
+    # 第二轮：所有进程共用一个 0.5 秒的等待预算，超时者强制 kill
+    if procs_to_reap:
+        _, alive = psutil.wait_procs(procs_to_reap, timeout=0.5)
+        for proc in alive:
+            try:
+                proc.kill()
+                logger.info(f"[atexit Cleanup] psutil kill signal sent for PID {proc.pid}.")
+            except psutil.NoSuchProcess:
+                pass
+            except Exception as ps_err:
+                logger.info(f"[atexit Cleanup] Error killing PID {proc.pid}: {ps_err}")
+
     logger.info("--- [atexit Cleanup] Cleanup function finished ---")
 
 
@@ -163,7 +190,7 @@ def handle_disconnect(page: Optional[ft.Page], app_state: "AppState", e):
     # TODO: In a full multi-process model, this might need to signal all running processes or be handled differently.
     logger.info(f"--- [Disconnect Event] Triggered! Setting main stop_event. Event data: {e} ---")
     if not app_state.stop_event.is_set():  # Still uses the old singleton event
-        app_state.stop_event.set()
+        call_in_page_loop(page, app_state.stop_event.set)
     logger.info("[Disconnect Event] Main stop_event set. atexit handler will perform final cleanup.")
 
 
@@ -185,7 +212,7 @@ def stop_managed_process(process_id: str, page: Optional[ft.Page], app_state: "A
     # 发送停止信号
     if not process_state.stop_event.is_set():
         logger.info(f"[停止管理] 设置停止事件: '{process_id}' (脚本: {process_state.script_path})")
-        process_state.stop_event.set()
+        call_in_page_loop(page, process_state.stop_event.set)
 
     # 尝试优雅终止进程
     _terminate_process_gracefully(process_id, process_state.process_handle, process_state.pid)
@@ -196,25 +223,22 @@ def stop_managed_process(process_id: str, page: Optional[ft.Page], app_state: "A
     process_state.pid = None
     logger.info(f"[停止管理] 进程 '{process_id}' 已标记为停止")
     
-    # 重要：清除stop_event，以便下次启动
-    process_state.stop_event.clear()
+    # 重要：清除stop_event，以便下次启动（与 set 经同一事件循环排队，保证先后顺序）
+    call_in_page_loop(page, process_state.stop_event.clear)
     logger.info(f"[停止管理] 进程 '{process_id}' 的stop_event已清除")
 
     # 如果是主机器人进程则更新UI
     if process_id == "mmc":
         update_buttons_state(page, app_state, is_running=False)
         app_state.clear_process()  # 清理旧状态保持兼容
-        app_state.stop_event.clear()  # 确保主停止事件也被清除
+        call_in_page_loop(page, app_state.stop_event.clear)  # 确保主停止事件也被清除
         logger.info(f"[停止管理] 主stop_event已清除")
         
-        # 清空命令行显示
+        # 追加停止提示（保留已有日志，下次启动时会清空），不阻塞UI线程
         if app_state.output_list_view:
-            logger.info(f"[停止管理] 清空MMC命令行显示")
-            time.sleep(0.5)
-            app_state.output_list_view.controls.clear()
-            app_state.output_list_view.controls.append(ft.Text("--- Bot 进程已停止，命令行已清空 ---", italic=True))
+            app_state.output_list_view.controls.append(ft.Text("--- Bot 进程已停止 ---", italic=True))
             if page:
-                page.update()
+                page.run_task(update_page_safe, page)
 
     # TODO: Add UI update logic for other processes if a management view exists
 
@@ -225,55 +249,60 @@ def stop_bot_process(page: Optional[ft.Page], app_state: "AppState"):
     stop_managed_process("mmc", page, app_state)
 
 
-# --- Parameterized Reader Thread ---
-def read_process_output(
-    app_state: "AppState",  # Still pass app_state for global checks? Or remove? Let's keep for now.
-    process_handle: Optional[subprocess.Popen] = None,
-    output_queue: Optional[queue.Queue] = None,
-    stop_event: Optional[threading.Event] = None,
-    process_id: str = "bot.py",  # ID for logging
+# --- Output Pump (runs on the event loop) ---
+async def pump_process_output(
+    process: subprocess.Popen,
+    decoder: codecs.IncrementalDecoder,
+    output_queue: "OutputBuffer",
+    process_state: "ManagedProcessState",
 ):
     """
-    Background thread function to read raw output from a process and put it into a queue.
-    Defaults to using AppState singletons if specific handles/queues/events aren't provided.
+    Reads a subprocess's stdout on the event loop and feeds complete lines into its OutputBuffer.
+    Runs alongside output_processor_loop, so no reader thread is needed per process.
     """
-    # Use provided arguments or default to AppState singletons
-    proc_handle = process_handle if process_handle is not None else app_state.bot_process
-    proc_queue = output_queue if output_queue is not None else app_state.output_queue
-    proc_stop_event = stop_event if stop_event is not None else app_state.stop_event
-
-    if not proc_handle or not proc_handle.stdout:
-        if not proc_stop_event.is_set():
-            logger.info(f"[Reader Thread - {process_id}] Error: Process or stdout not available at start.")
-        return
-
-    logger.info(f"[Reader Thread - {process_id}] Started.")
+    process_id = process_state.process_id
+    logger.info(f"[Output Pump - {process_id}] Started.")
+    tail = ""  # 尚未遇到换行符的残余文本
+    stdout_transport = None
     try:
-        for line in iter(proc_handle.stdout.readline, ""):
-            if proc_stop_event.is_set():
-                # logger.info(f"[Reader Thread - {process_id}] Stop event detected, exiting.")
+        # 把 Popen 的 stdout 管道挂到事件循环上，之后由 StreamReader 异步读取
+        stdout_reader = asyncio.StreamReader()
+        stdout_transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stdout_reader), process.stdout
+        )
+        while True:
+            # 按块读取后自行切分行：不受 StreamReader 单行长度上限影响，也减少每行一次的调度开销
+            chunk = await stdout_reader.read(65536)
+            if process_state.status != "running":
+                break  # 进程已被主动停止，丢弃剩余输出
+            if not chunk:
+                # End of stream: 刷新残余文本并通知处理循环
+                rest = tail + decoder.decode(b"", final=True)
+                if rest:
+                    output_queue.put(_tag_line(rest))
+                output_queue.put(None)
+                # 输出结束后在线程池中回收子进程，避免留下僵尸进程
+                await asyncio.to_thread(process.wait)
                 break
-            if line:
-                proc_queue.put(line.strip())
-            else:
-                break  # End of stream
-    except ValueError:
-        # This might happen if the process closes stdout abruptly while reading.
-        if not proc_stop_event.is_set():
-            logger.info(f"[Reader Thread - {process_id}] ValueError likely due to closed stdout.")
+            lines = (tail + decoder.decode(chunk)).split("\n")
+            tail = lines.pop()  # 最后一段可能是不完整的行
+            for line in lines:
+                # 预先判断是否含有颜色标记，无标记的行在处理循环中跳过正则解析
+                output_queue.put(_tag_line(line))
     except Exception as e:
-        # Catch other potential reading errors.
-        if not proc_stop_event.is_set():
-            logger.info(f"[Reader Thread - {process_id}] Error reading output: {e}")
+        if process_state.status == "running":
+            logger.info(f"[Output Pump - {process_id}] Error reading output: {e}")
+            output_queue.put(None)
     finally:
-        # Signal the natural end of the stream to the processor loop.
-        if not proc_stop_event.is_set():
-            try:
-                # Use put_nowait or handle potential Full exception if queue is bounded
-                proc_queue.put(None)
-            except Exception as q_err:
-                logger.info(f"[Reader Thread - {process_id}] Error putting None signal: {q_err}")
-        logger.info(f"[Reader Thread - {process_id}] Finished.")
+        if stdout_transport is not None:
+            stdout_transport.close()  # 同时关闭管道
+    logger.info(f"[Output Pump - {process_id}] Finished.")
+
+
+def _tag_line(line: str) -> Tuple[bool, str]:
+    """Strips a raw output line and flags whether it carries color markup (ANSI escapes or Loguru tags)."""
+    line = line.strip()
+    return ("\x1b[" in line or "<" in line, line)
 
 
 # --- Parameterized Processor Loop ---
@@ -281,14 +310,17 @@ async def output_processor_loop(
     page: Optional[ft.Page],
     app_state: "AppState",  # Pass AppState for PID checks and potentially global state access
     process_id: str = "bot.py",  # ID to identify the process and its state
-    output_queue: Optional[queue.Queue] = None,
-    stop_event: Optional[threading.Event] = None,
+    output_queue: Optional["OutputBuffer"] = None,
+    stop_event: Optional[asyncio.Event] = None,
     target_list_view: Optional[ft.ListView] = None,
 ):
     logger.info(f"[Processor Loop - {process_id}] Started.")
     proc_queue = output_queue if output_queue is not None else app_state.output_queue
     proc_stop_event = stop_event if stop_event is not None else app_state.stop_event
     output_lv = target_list_view 
+
+    pending_lines = proc_queue.lines
+    has_data = proc_queue.has_data
     
     # 检查是否为适配器进程
     is_adapter = process_id.startswith("adapter_")
@@ -298,59 +330,93 @@ async def output_processor_loop(
     batch_update_interval = 0.5  # 批量更新间隔，单位秒
     last_update_time = time.time()  # 上次更新时间
     max_batch_size = 20  # 最大批次大小，超过此值将立即更新
+    max_lines = 800  # 可配置的最大行数
+
+    # 被裁剪掉的日志行控件进入空闲池，供后续新行复用，减少控件分配与GC
+    text_pool = deque(maxlen=max_lines)
 
     # --- 新增监控变量 ---
-    last_metrics_log_time = time.time()
-    metrics_log_interval = 5 # 每5秒记录一次聚合指标
+    last_metrics_log_time = time.monotonic()
+    metrics_log_interval = 5 # 每5秒记录一次聚合指标（仅在 debug_metrics_enabled 时）
 
 
-    while not proc_stop_event.is_set():
-        message_batch = []  # 消息缓冲区
-        
-        
-        loop_start_time = time.monotonic() # 记录循环开始时间
+    # 逐行热路径中使用的局部别名（LOAD_FAST 代替全局/属性查找）
+    popleft_line = pending_lines.popleft
+    pop_pooled_text = text_pool.popleft
+    parse = parse_log_line_to_spans
+    Text = ft.Text
+
+    # 停止信号只需等待一次：与“有新数据”竞争，任一完成即唤醒本循环
+    stop_task = asyncio.ensure_future(proc_stop_event.wait())
+
+    while not stop_task.done():
+        # 没有待处理数据时等待输出泵唤醒；超时后继续循环，以便刷新积压批次并检查进程状态
+        output_idle = False  # 本轮是否等满了一个间隔仍无新输出
+        if not pending_lines:
+            data_task = asyncio.ensure_future(has_data.wait())
+            try:
+                await asyncio.wait(
+                    {data_task, stop_task}, timeout=batch_update_interval, return_when=asyncio.FIRST_COMPLETED
+                )
+            except asyncio.CancelledError:
+                logger.info(f"[Processor Loop - {process_id}] Cancelled while waiting for output.")
+                if not proc_stop_event.is_set():
+                    proc_stop_event.set()
+                break # 如果被取消则退出循环
+            finally:
+                output_idle = not data_task.done()
+                if not data_task.done():
+                    data_task.cancel()
+            if stop_task.done():
+                break
+        # 先清除事件再取数据：之后到达的行一定会重新设置事件
+        has_data.clear()
+
+        # 性能指标（计时与 [Processor Metrics] 日志）默认关闭，每轮读取一次开关，关闭时热路径不做任何计时
+        metrics_enabled = app_state.debug_metrics_enabled
+        if metrics_enabled:
+            loop_start_time = time.monotonic() # 记录循环开始时间
 
         process_ended_signal_received = False
-        current_time = time.time()
-        time_since_last_update = current_time - last_update_time
-        
-        # 持续从队列获取消息，直到队列为空或达到最大批次大小
-        queue_empty = False
-        processed_in_batch = 0 # 本轮批处理的消息数
         
-        batch_collection_start_time = time.monotonic()
-        while len(message_batch) < max_batch_size and not queue_empty and not proc_stop_event.is_set():
-            try:
-                raw_line = proc_queue.get_nowait()
-                processed_in_batch +=1
-                if raw_line is None:
-                    process_ended_signal_received = True
-                    logger.info(f"[Processor Loop - {process_id}] Process ended signal received from reader.")
-                    if process_id == "mmc": # <--- 修改: "bot.py" -> "mmc"
-                        message_batch.append(ft.Text("--- Bot 进程已结束，可重新启动 ---", italic=True))
+        # 持续从缓冲区获取消息，直到缓冲区为空或达到最大批次大小
+        if metrics_enabled:
+            batch_collection_start_time = time.monotonic()
+        append = message_batch.append
+        while pending_lines and len(message_batch) < max_batch_size:
+            raw_line = popleft_line()
+            if raw_line is None:
+                process_ended_signal_received = True
+                logger.info(f"[Processor Loop - {process_id}] Process ended signal received from reader.")
+                if process_id == "mmc": # <--- 修改: "bot.py" -> "mmc"
+                    message_batch.append(ft.Text("--- Bot 进程已结束，可重新启动 ---", italic=True))
+                else:
+                    message_batch.append(ft.Text(f"--- Process '{process_id}' 已结束 --- ", italic=True))
+                break
+            else:
+                has_markup, line_text = raw_line
+                if has_markup:
+                    spans = parse(line_text)
+                    if text_pool:
+                        text_obj = pop_pooled_text()
+                        text_obj.value = None
+                        text_obj.spans = spans
                     else:
-                        message_batch.append(ft.Text(f"--- Process '{process_id}' 已结束 --- ", italic=True))
-                    break
+                        text_obj = Text(spans=spans, selectable=True, size=12, data=_LOG_LINE_TAG)
                 else:
-                    spans = parse_log_line_to_spans(raw_line)
-                    text_obj = ft.Text(spans=spans, selectable=True, size=12)
-                    message_batch.append(text_obj)
-                    
-                    span_text_preview = ""
-                    if spans:
-                        # 尝试从spans中提取文本进行预览
-                        try:
-                            span_text_preview = "".join([span.text for span in spans if hasattr(span, 'text') and span.text])
-                            if len(span_text_preview) > 100:
-                                span_text_preview = span_text_preview[:97] + "..."
-                        except Exception as e:
-                            span_text_preview = f"(无法提取文本: {e})"
-                    
-                    # logger.info(f"[调试] 添加到控制台的文本: {span_text_preview or '(spans模式，无法提取内容)'}")
-            except queue.Empty:
-                queue_empty = True
-        batch_collection_duration = time.monotonic() - batch_collection_start_time
+                    # 快速路径：纯文本行直接设置 value，不经过颜色解析
+                    if text_pool:
+                        text_obj = pop_pooled_text()
+                        text_obj.spans = None
+                        text_obj.value = line_text
+                    else:
+                        text_obj = Text(line_text, selectable=True, size=12, data=_LOG_LINE_TAG)
+                append(text_obj)
+        if metrics_enabled:
+            batch_collection_duration = time.monotonic() - batch_collection_start_time
         
+        time_since_last_update = time.time() - last_update_time
+
         # 判断是否需要更新UI：
         # 1. 缓冲区有消息且已经到了更新间隔
         # 2. 缓冲区有消息且数量达到了最大批次大小
@@ -362,63 +428,69 @@ async def output_processor_loop(
         )
         
         ui_update_duration = 0 # 初始化，确保在不更新UI的循环中也有定义
-        if should_update and message_batch and output_lv and not proc_stop_event.is_set():
-            ui_update_start_time = time.monotonic()
+        if should_update and message_batch and output_lv:
+            if metrics_enabled:
+                ui_update_start_time = time.monotonic()
             # --- UI Update Logic ---
-            # 确定是否在手动查看模式
+            # 确定是否在手动查看模式；自动滚动开启（常见情况）时直接短路，跳过位置保存与 scroll_to
             is_manual_viewing_active = (
-                process_id == "mmc" and # <--- 修改: "bot.py" -> "mmc"
-                hasattr(app_state, "manual_viewing") and app_state.manual_viewing and
-                not getattr(output_lv, "auto_scroll", True)
+                not output_lv.auto_scroll
+                and process_id == "mmc" # <--- 修改: "bot.py" -> "mmc"
+                and app_state.manual_viewing
             )
 
             current_first_visible = 0
-            if is_manual_viewing_active and hasattr(output_lv, "first_visible"):
-                current_first_visible = output_lv.first_visible or 0
-
-            # 限制历史长度并添加新消息
-            max_lines = 800  # 可配置的最大行数
-            current_len = len(output_lv.controls)
-            num_new_lines = len(message_batch)
-            
-            lines_to_remove_count = 0
-            if current_len + num_new_lines > max_lines:
-                lines_to_remove_count = (current_len + num_new_lines) - max_lines
-                if lines_to_remove_count > current_len: # Cannot remove more than what exists
-                    lines_to_remove_count = current_len
-                
-            if lines_to_remove_count > 0:
-                trim_start_time = time.monotonic()
-                del output_lv.controls[0:lines_to_remove_count]
-                trim_duration = time.monotonic() - trim_start_time
-                logger.info(f"[Processor Metrics - {process_id}] Trimmed: {lines_to_remove_count} old lines in {trim_duration:.4f}s. Current controls: {len(output_lv.controls)}")
+            if is_manual_viewing_active:
+                current_first_visible = getattr(output_lv, "first_visible", 0) or 0
 
             # 批量添加所有新消息
-            add_controls_start_time = time.monotonic()
+            if metrics_enabled:
+                add_controls_start_time = time.monotonic()
             output_lv.controls.extend(message_batch)
-            add_controls_duration = time.monotonic() - add_controls_start_time
-            logger.info(f"[Processor Metrics - {process_id}] Added: {num_new_lines} new lines in {add_controls_duration:.4f}s. Total controls: {len(output_lv.controls)}")
-            
+            if metrics_enabled:
+                add_controls_duration = time.monotonic() - add_controls_start_time
+                logger.info(f"[Processor Metrics - {process_id}] Added: {len(message_batch)} new lines in {add_controls_duration:.4f}s. Total controls: {len(output_lv.controls)}")
+
+            # 仅在超出上限时裁剪：一次切片赋值保留最近 max_lines 行，Flet 只需计算一次差异
+            lines_to_remove_count = len(output_lv.controls) - max_lines
+            evicted = None
+            if lines_to_remove_count > 0:
+                if metrics_enabled:
+                    trim_start_time = time.monotonic()
+                evicted = output_lv.controls[:lines_to_remove_count]
+                output_lv.controls[:] = output_lv.controls[-max_lines:]
+                if metrics_enabled:
+                    trim_duration = time.monotonic() - trim_start_time
+                    logger.info(f"[Processor Metrics - {process_id}] Trimmed: {lines_to_remove_count} old lines in {trim_duration:.4f}s. Current controls: {len(output_lv.controls)}")
+
 
             if is_manual_viewing_active and lines_to_remove_count > 0:
                 adjusted_first_visible = max(0, current_first_visible - lines_to_remove_count)
-                if output_lv.first_visible != adjusted_first_visible:
+                if getattr(output_lv, "first_visible", None) != adjusted_first_visible:
                     output_lv.scroll_to(index=adjusted_first_visible, animate=False) # No animation for bg adjustment
-                    logger.info(f"[Processor Metrics - {process_id}] Manual view: Adjusted scroll from {current_first_visible} to {adjusted_first_visible} due to trimming.")
+                    logger.debug("[Processor Metrics - {}] Manual view: Adjusted scroll from {} to {} due to trimming.", process_id, current_first_visible, adjusted_first_visible)
     
             
-            page_update_call_duration = 0
-            # 更新UI（如果可见）
-            if output_lv.visible and page:
-                page_update_start = time.monotonic()
+            # 更新UI（仅当用户正在查看该控制台；否则只缓存控件，进入视图时由路由变更的 page.update() 一次性推送）
+            if output_lv.visible and page and app_state.active_console_id == process_id:
+                if metrics_enabled:
+                    page_update_start = time.monotonic()
                 await update_page_safe(page)
-                page_update_call_duration = time.monotonic() - page_update_start
-                logger.info(f"[Processor Metrics - {process_id}] Called page.update(), duration: {page_update_call_duration:.4f}s (approx)")
+                if metrics_enabled:
+                    page_update_call_duration = time.monotonic() - page_update_start
+                    logger.info(f"[Processor Metrics - {process_id}] Called page.update(), duration: {page_update_call_duration:.4f}s (approx)")
+                # 被裁剪的控件只有在这次 update 把它们从页面移除之后才能回收复用；
+                # 控制台未被查看时它们可能仍显示在页面顶部，直接丢弃而不入池
+                if evicted:
+                    text_pool.extend(c for c in evicted if c.data == _LOG_LINE_TAG)
             
             # 重置批处理变量
             message_batch = []
             last_update_time = time.time()
-            ui_update_duration = time.monotonic() - ui_update_start_time
+            if metrics_enabled:
+                ui_update_duration = time.monotonic() - ui_update_start_time
+        elif should_update and not output_lv:
+            message_batch = []  # 没有可用的输出视图，丢弃本批消息
         
         # 处理进程结束信号
         if process_ended_signal_received:
@@ -435,7 +507,7 @@ async def output_processor_loop(
                 
                 # 如果是适配器进程，更新适配器管理界面
                 if is_adapter and page:
-                    page.run_task(lambda: update_ui_after_adapter_stop(page, app_state))
+                    page.run_task(update_ui_after_adapter_stop, page, app_state, process_id)
                 
             # 如果是主机器人进程，更新旧状态和按钮
             if process_id == "mmc": # <--- 修改: "bot.py" -> "mmc"
@@ -448,7 +520,8 @@ async def output_processor_loop(
         current_pid = current_proc_state.pid if current_proc_state else None
 
         # 只有当我们期望进程在运行时才检查PID存在性
-        if current_pid is not None and current_proc_state and current_proc_state.status == "running":
+        # 进程退出后管道中可能仍有未读完的输出（正常结束由输出泵的结束信号处理），因此仅在输出空闲时检查
+        if output_idle and current_pid is not None and current_proc_state and current_proc_state.status == "running":
             if not psutil.pid_exists(current_pid) and not proc_stop_event.is_set():
                 logger.info(
                     f"[Processor Loop - {process_id}] Process PID {current_pid} ended unexpectedly. Setting stop event.",
@@ -473,56 +546,38 @@ async def output_processor_loop(
                     update_buttons_state(page, app_state, is_running=False)
                 break # 检测到意外终止后退出循环
         
-        loop_duration = time.monotonic() - loop_start_time
-
-        # --- 定期记录聚合指标 ---
-        if time.time() - last_metrics_log_time >= metrics_log_interval:
-            queue_size = -1 # Default if queue is None or qsize fails
-            if proc_queue: # 检查队列是否存在
-                try:
-                    queue_size = proc_queue.qsize()
-                except NotImplementedError: # 一些平台/队列类型可能不支持qsize
-                    queue_size = -2 # 表示不支持
-            
+        # --- 定期记录聚合指标（默认关闭）---
+        if metrics_enabled and time.monotonic() - last_metrics_log_time >= metrics_log_interval:
+            loop_duration = time.monotonic() - loop_start_time
+            queue_size = len(pending_lines)
             active_threads = threading.active_count()
-            memory_info = psutil.Process(os.getpid()).memory_info()
+            memory_info = _SELF_PROC.memory_info()
             current_lv_controls_count = len(output_lv.controls) if output_lv else 'N/A'
             logger.info(f"[Processor Metrics - {process_id}] Interval Log: QueueSize={queue_size}, BatchCollectTime={batch_collection_duration:.4f}s, LastUIUpdateBlock={ui_update_duration:.4f}s, LoopTime={loop_duration:.4f}s, ActiveThreads={active_threads}, MemRSS={memory_info.rss / 1024**2:.2f}MB, ListViewControls={current_lv_controls_count}")
-            last_metrics_log_time = time.time()
-
-
-        # 如果队列为空且没有消息要处理，等待一小段时间
-        if queue_empty and not message_batch:
-            try:
-                await asyncio.sleep(0.01) # 轮询间隔, 略微缩短
-            except asyncio.CancelledError:
-                logger.info(f"[Processor Loop - {process_id}] Cancelled during sleep.")
-                if not proc_stop_event.is_set():
-                    proc_stop_event.set()
-                break # 如果被取消则退出循环
+            last_metrics_log_time = time.monotonic()
 
+    if not stop_task.done():
+        stop_task.cancel()
     # logger.info(f"[Processor Loop - {process_id}] Exited.")
 
 
 # --- 添加辅助函数更新适配器界面 ---
-async def update_ui_after_adapter_stop(page: ft.Page, app_state: "AppState"):
-    """当适配器进程停止后，更新适配器界面"""
-    # 导入 create_adapters_view 函数
-    from .ui_views import create_adapters_view
-    
-    # 找到适配器视图并更新
-    for view in page.views:
-        if view.route == "/adapters":
-            # 简单地重新加载视图
-            page.views.remove(view)
-            new_adapters_view = create_adapters_view(page, app_state)
-            page.views.append(new_adapters_view)
-            page.update()
-            break
+async def update_ui_after_adapter_stop(page: ft.Page, app_state: "AppState", process_id: str):
+    """当适配器进程停止后，只刷新适配器界面中该进程对应的行"""
+    row = app_state.adapters_view_refs.get(process_id)
+    # 适配器视图未挂载（用户在其它页面）时无需刷新，下次进入时会重新构建
+    if row is None or row.page is None:
+        return
+    # row.data 为重建该行控件的函数（见 create_adapters_view）
+    row.controls = row.data()
+    try:
+        row.update()
+    except Exception:
+        pass  # 视图可能已被移除
 
 
 # --- New Generic Start Function ---
-def start_managed_process(
+async def start_managed_process(
     script_path: str,
     type: str,
     display_name: str,
@@ -533,11 +588,12 @@ def start_managed_process(
     """
     启动一个受管理的后台进程，创建其状态并启动读取器/处理器
     Starts a managed background process, creates its state, and starts reader/processor.
+    子进程在线程池中创建，输出由事件循环上的 pump_process_output 协程读取
     
     返回: (是否成功: 布尔值, 消息: 可选字符串)
     Returns: (success: bool, message: Optional[str])
     """
-    from .state import ManagedProcessState  # Dynamic import
+    from .state import ManagedProcessState, OutputBuffer  # Dynamic import
     
 
 
@@ -558,6 +614,11 @@ def start_managed_process(
         msg = f"进程 '{display_name}' (ID: {process_id}) 已在运行中"
         logger.info(f"[Start Managed] {msg}")
         return False, msg
+    # 创建子进程期间会让出事件循环，防止重复点击再次启动
+    if existing_state and existing_state.status == "starting":
+        msg = f"进程 '{display_name}' (ID: {process_id}) 正在启动中"
+        logger.info(f"[Start Managed] {msg}")
+        return False, msg
         
     # 检查脚本文件是否存在
     full_path = script_path
@@ -583,10 +644,12 @@ def start_managed_process(
     # 如果进程之前存在但已经停止，先清理旧的stop_event
     if existing_state and existing_state.stop_event and existing_state.stop_event.is_set():
         logger.info(f"[Start Managed] 清理之前设置的stop_event: {process_id}")
-        existing_state.stop_event.clear()
+        call_in_page_loop(page, existing_state.stop_event.clear)
     
-    new_queue = app_state.output_queue if is_main_bot else queue.Queue()
-    new_event = app_state.stop_event if is_main_bot else threading.Event()
+    new_queue = app_state.output_queue if is_main_bot else OutputBuffer()
+    if is_main_bot:
+        new_queue.lines.clear()  # 丢弃上次运行停止后残留的输出
+    new_event = app_state.stop_event if is_main_bot else asyncio.Event()
 
     # 检查是否之前运行过
     has_run_before = False
@@ -698,17 +761,23 @@ def start_managed_process(
         selected_encoding = app_state.gui_config.get("subprocess_encoding", "utf-8")
         logger.info(f"[Start Managed - {process_id}] 使用编码 '{selected_encoding}' 启动子进程 (来自 GUI 设置)")
 
-        process = subprocess.Popen(
-            cmd_list,  # 使用构建好的命令列表
-            cwd=app_state.script_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            encoding=selected_encoding, 
-            errors="replace", # 替换无法解码的字符，避免程序崩溃
-            bufsize=1, # 行缓冲
-            creationflags=subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0,
-            env=sub_env,
+        # 输出按所选编码增量解码，替换无法解码的字符，避免程序崩溃
+        decoder = codecs.getincrementaldecoder(selected_encoding)(errors="replace")
+
+        # 在线程池中创建子进程，Popen 较慢时（杀毒扫描、冷磁盘）不阻塞页面事件循环；
+        # 输出由事件循环上的 pump_process_output 协程读取，无需读取线程
+        process = await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                _PipePopen,
+                cmd_list,  # 使用构建好的命令列表
+                cwd=app_state.script_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0,
+                creationflags=_CREATE_NO_WINDOW,
+                env=sub_env,
+            ),
         )
 
         # Update the state with handle and PID
@@ -724,15 +793,8 @@ def start_managed_process(
             app_state.bot_pid = process.pid
             update_buttons_state(page, app_state, is_running=True)
 
-        # Start the PARAMETERIZED reader thread
-        output_thread = threading.Thread(
-            target=read_process_output,
-            args=(app_state, process, new_queue, new_event, process_id),  # Pass specific objects
-            daemon=True,
-        )
-        output_thread.start()
-        logger.info(f"[Start Managed - {process_id}] Output reader thread started.")
-
+        page.run_task(pump_process_output, process, decoder, new_queue, new_process_state)
+        logger.info(f"[Start Managed - {process_id}] Output pump scheduled.")
 
         page.run_task(output_processor_loop,
                     page=page,
@@ -747,13 +809,12 @@ def start_managed_process(
 
     except Exception as e:
         logger.info(f"[Start Managed - {process_id}] Error during startup:")
-        traceback.logger.info_exc()
+        logger.info(traceback.format_exc())
         # Clean up state if startup failed
+        # new_process_state 就是 managed_processes 中保存的同一对象，直接修改即可，无需再查字典
         new_process_state.status = "error"
         new_process_state.process_handle = None
         new_process_state.pid = None
-        if process_id in app_state.managed_processes:  # Might be redundant check
-            app_state.managed_processes[process_id].status = "error"
 
         if is_main_bot:  # Update UI/state for main bot failure
             app_state.clear_process()
@@ -766,7 +827,7 @@ def start_managed_process(
 
 # --- Adapted Start Bot Function (Calls new generic start) ---
 
-def start_bot_and_show_console(page: ft.Page, app_state: "AppState"):
+async def start_bot_and_show_console(page: ft.Page, app_state: "AppState"):
     """
     启动主机器人进程(使用app_state.bot_script_path中的路径)
     并导航到控制台视图。
@@ -777,7 +838,7 @@ def start_bot_and_show_console(page: ft.Page, app_state: "AppState"):
     logger.info(f"[Start Console] Using bot script path: {bot_script}")
     logger.info(f"[Start Console] 调用start_managed_process,bot_script={bot_script}")
     # --- Call the generic start function --- #
-    success, error_message = start_managed_process(
+    success, error_message = await start_managed_process(
         script_path=bot_script,
         type = "mmc",
         display_name="MaiCore",  # Display name for the main bot
@@ -810,22 +871,20 @@ def start_maicore_in_new_window(page: ft.Page, app_state: "AppState"):
     try:
         logger.info(f"[启动新窗口] 准备启动新窗口中的MaiCore: {bot_script}")
         
-        if platform.system() == "Windows":
-            # Windows系统使用start命令在新窗口启动
-            # 修复Windows下引号嵌套的问题
-            python_path = app_state.python_path.replace('"', '')
-            bot_script_path = bot_script.replace('"', '')
-            cmd = f'start cmd.exe /k {python_path} {bot_script_path}'
+        if _IS_WINDOWS:
+            # Windows系统直接在新控制台中运行 cmd.exe /k（进程结束后保留窗口），不再经过 shell 和 start
+            # list2cmdline 负责给含空格的路径加引号；/k 后整体再包一层引号，避免 cmd 剥掉路径两端的引号
+            inner_cmd = subprocess.list2cmdline([app_state.python_path, bot_script])
+            cmd = f'cmd.exe /k "{inner_cmd}"'
             logger.info(f"[启动新窗口] Windows命令: {cmd}")
-            subprocess.Popen(cmd, shell=True, cwd=app_state.script_dir)
+            subprocess.Popen(cmd, cwd=app_state.script_dir, creationflags=subprocess.CREATE_NEW_CONSOLE)
         else:
             # Linux/Mac系统
-            terminal_cmd = "gnome-terminal"  # 默认使用gnome-terminal
-            if platform.system() == "Darwin":  # macOS
-                terminal_cmd = "open -a Terminal"
+            terminal_argv = ["gnome-terminal"]  # 默认使用gnome-terminal
+            if _IS_MAC:  # macOS
+                terminal_argv = ["open", "-a", "Terminal"]
             
-            cmd = f'{terminal_cmd} -- {app_state.python_path} "{bot_script}"'
-            subprocess.Popen(cmd, shell=True, cwd=app_state.script_dir)
+            subprocess.Popen([*terminal_argv, "--", app_state.python_path, bot_script], cwd=app_state.script_dir)
             
         logger.info(f"[启动新窗口] 成功启动MaiCore在新窗口")
         show_snackbar(page, "已在新窗口启动MaiCore")
@@ -1,12 +1,51 @@
 import flet as ft
+import asyncio
 import os
 import sys
 import subprocess
+import codecs
 import platform
+import re
+import shutil
 from pathlib import Path
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import urllib.request
 import time
+import venv
+
+# Python 解释器版本缓存，键为解释器的真实路径，避免重复启动子进程查询版本
+_PYTHON_VERSION_CACHE = {}
+
+# 平台信息在导入时确定一次，避免各代码路径重复调用 platform.system()
+_SYSTEM = platform.system()
+_IS_WINDOWS = _SYSTEM == "Windows"
+
+# 安装输出中需要显示在界面上的行（其余行不发送到界面），命名分组决定显示颜色
+_PIP_LINE_RE = re.compile(r"^(?:(?P<err>ERROR)|(?P<warn>WARNING)|(?P<ok>Successfully installed)|Collecting |Installing )")
+# uv 的输出格式不同（小写的 error/warning，安装结果为 "+ 包名==版本"）
+_UV_LINE_RE = re.compile(r"^(?:(?P<err>error)|(?P<warn>warning)|(?P<ok>Installed )|Resolved |Uninstalled |\+ )")
+_LINE_COLORS = {"err": "red", "warn": "orange", "ok": "green"}
+
+if _IS_WINDOWS:
+    _PYTHON_EXE_RE = re.compile(r"^python(3(\.?\d+)?)?\.exe$", re.IGNORECASE)
+else:
+    _PYTHON_EXE_RE = re.compile(r"^python3(\.\d+)?$")
+
+
+def _fast_rmtree(path):
+    """
+    先把目录改名移开，再在后台线程中删除，调用方可以立即在原路径上创建新目录。
+    改名失败（如文件被占用）时退回同步删除。
+    """
+    trash_path = f"{path}.old.{os.getpid()}.{int(time.time())}"
+    try:
+        os.rename(path, trash_path)
+    except OSError:
+        shutil.rmtree(path)
+        return
+    threading.Thread(target=shutil.rmtree, args=(trash_path,), kwargs={"ignore_errors": True}, daemon=True).start()
+
 
 class PythonInstallerApp:
     def __init__(self, page: ft.Page, on_close_callback=None):
@@ -23,6 +62,19 @@ class PythonInstallerApp:
             auto_scroll=True,
             height=200,
         )
+        # 日志批量刷新：add_log 只缓存消息，由界面刷新协程统一添加到日志区域
+        self._log_pending = []
+        self._log_lock = threading.Lock()
+        # 界面刷新：各处只标记需要刷新，由 _ui_flush_loop 合并为一次 page.update()
+        self._ui_dirty = asyncio.Event()
+        self._ui_task = None
+        self._ui_closed = False
+
+        # 项目虚拟环境中的解释器和 pip 路径只解析一次
+        self.venv_dir = Path("venv").resolve()
+        venv_bin_dir = self.venv_dir / ("Scripts" if _IS_WINDOWS else "bin")
+        self.venv_python = str(venv_bin_dir / ("python.exe" if _IS_WINDOWS else "python"))
+        self.venv_pip = str(venv_bin_dir / ("pip.exe" if _IS_WINDOWS else "pip"))
         
         # 操作按钮
         self.download_button = ft.ElevatedButton(
@@ -143,6 +195,9 @@ class PythonInstallerApp:
         """关闭对话框"""
         self.dialog.open = False
         self.page.update()
+        # 停止界面刷新协程
+        self._ui_closed = True
+        self._request_ui_update()
         
         # 调用关闭回调
         if self.on_close_callback:
@@ -156,14 +211,56 @@ class PythonInstallerApp:
         """显示安装对话框"""
         self.dialog.open = True
         self.page.update()
+        self._ui_closed = False
+        self._ui_task = self.page.run_task(self._ui_flush_loop)
         
         # 立即执行检测
         threading.Thread(target=self.check_python_env).start()
         
+    async def _ui_flush_loop(self):
+        """唯一负责推送界面更新的协程：一帧 (约16ms) 内的所有状态变更和日志合并为一次 page.update()"""
+        while not self._ui_closed:
+            await self._ui_dirty.wait()
+            self._ui_dirty.clear()
+            await asyncio.sleep(0.016)
+            self._flush_logs()
+            try:
+                self.page.update()
+            except Exception as e:
+                print(f"[Python安装器] 界面更新失败: {e}")
+
+    def _request_ui_update(self):
+        """请求在下一帧刷新界面，可在任意线程调用"""
+        loop = self.page.loop
+        if self._ui_task is None or self._ui_task.done() or loop is None or not loop.is_running():
+            # 刷新协程未运行（如对话框尚未显示），直接同步更新
+            self._flush_logs()
+            self.page.update()
+            return
+        loop.call_soon_threadsafe(self._ui_dirty.set)
+
     def add_log(self, message, color="black"):
-        """向日志区域添加消息"""
-        self.log_view.controls.append(ft.Text(message, color=color, selectable=True))
-        self.log_view.update()
+        """向日志区域添加消息（与其它界面变更合并到下一帧一起刷新）"""
+        with self._log_lock:
+            self._log_pending.append(ft.Text(message, color=color, selectable=True))
+        self._request_ui_update()
+
+    def add_logs(self, entries):
+        """批量添加日志 [(消息, 颜色), ...]，整批只请求一次界面刷新"""
+        if not entries:
+            return
+        texts = [ft.Text(message, color=color, selectable=True) for message, color in entries]
+        with self._log_lock:
+            self._log_pending.extend(texts)
+        self._request_ui_update()
+
+    def _flush_logs(self):
+        """将缓存的日志一次性添加到日志区域（不单独更新，随 page.update() 一起发送）"""
+        with self._log_lock:
+            pending = self._log_pending
+            self._log_pending = []
+        if pending:
+            self.log_view.controls.extend(pending)
     
     def check_python_env(self, e=None):
         """检查系统中的Python环境"""
@@ -177,10 +274,10 @@ class PythonInstallerApp:
             self.install_button.visible = False
             self.create_venv_button.visible = False
             self.install_req_button.visible = False
-            self.page.update()
+            self._request_ui_update()
             
             # 检测系统类型
-            system_info = f"操作系统: {platform.system()} {platform.release()}, {platform.architecture()[0]}"
+            system_info = f"操作系统: {_SYSTEM} {platform.release()}, {platform.architecture()[0]}"
             self.add_log(system_info)
             
             # 查找Python路径
@@ -191,13 +288,15 @@ class PythonInstallerApp:
                 self.update_status("未找到Python安装，请点击下载按钮", show_progress=False)
                 self.download_button.disabled = False
                 self.download_button.visible = True
-                self.page.update()
+                self._request_ui_update()
                 return
             
-            # 检查是否有Python 3.12.x版本
+            # 检查是否有Python 3.12.x版本（并行探测各解释器版本，总耗时取决于最慢的一个）
+            with ThreadPoolExecutor(max_workers=min(8, len(python_paths))) as executor:
+                versions = list(executor.map(self.get_python_version, python_paths))
+
             python312_path = None
-            for path in python_paths:
-                version = self.get_python_version(path)
+            for path, version in zip(python_paths, versions):
                 if version:
                     self.add_log(f"检测到Python: {path} - 版本: {version}")
                     if version.startswith("3.12"):
@@ -209,20 +308,12 @@ class PythonInstallerApp:
                 self.update_status("需要Python 3.12.x版本", show_progress=False)
                 self.download_button.disabled = False
                 self.download_button.visible = True
-                self.page.update()
+                self._request_ui_update()
                 return
             
             # 检查虚拟环境
             self.add_log("检测项目虚拟环境...")
-            venv_path = Path("venv")
-            venv_python = None
-            
-            if platform.system() == "Windows":
-                venv_python_path = venv_path / "Scripts" / "python.exe"
-            else:
-                venv_python_path = venv_path / "bin" / "python"
-                
-            if venv_path.exists() and venv_python_path.exists():
+            if self.venv_dir.exists() and os.path.exists(self.venv_python):
                 self.add_log("✅ 检测到有效的虚拟环境", color="green")
                 self.update_status("Python 3.12.x和虚拟环境已就绪", show_progress=False)
                 # 启用安装依赖按钮
@@ -234,59 +325,153 @@ class PythonInstallerApp:
                 self.create_venv_button.disabled = False
                 self.create_venv_button.visible = True
             
-            self.page.update()
+            self._request_ui_update()
         
         # 在后台线程运行检查逻辑
         threading.Thread(target=run_check).start()
     
     def find_python_paths(self):
-        """查找系统中的Python路径"""
+        """查找系统中的Python路径（直接扫描 PATH 和注册表，不启动 where/which 子进程）"""
         paths = []
-        try:
-            if platform.system() == "Windows":
-                # Windows下查找Python路径
-                output = subprocess.check_output(["where", "python"], text=True, stderr=subprocess.PIPE)
-                paths = [line.strip() for line in output.splitlines() if line.strip()]
-            else:
-                # Linux/Mac下查找Python路径
-                output = subprocess.check_output(["which", "python3"], text=True, stderr=subprocess.PIPE)
-                paths.append(output.strip())
-        except subprocess.CalledProcessError:
-            # 命令执行失败，可能是未安装Python
-            pass
-        
-        # 针对Windows，可能还需要检查Python Launcher路径
-        if platform.system() == "Windows":
-            program_files = os.environ.get("ProgramFiles", "C:\\Program Files")
-            python_dirs = list(Path(program_files).glob("Python*"))
-            for py_dir in python_dirs:
-                python_exe = py_dir / "python.exe"
-                if python_exe.exists() and str(python_exe) not in paths:
-                    paths.append(str(python_exe))
+        seen = set()
+
+        def add_path(path):
+            if not path or not os.path.isfile(path):
+                return
+            key = os.path.normcase(os.path.realpath(path))
+            if key not in seen:
+                seen.add(key)
+                paths.append(str(path))
+
+        for name in (("python",) if _IS_WINDOWS else ("python3",)):
+            add_path(shutil.which(name))
+
+        # 遍历 PATH 中的每个目录，匹配 python.exe / python3.x 等可执行文件
+        for directory in os.environ.get("PATH", "").split(os.pathsep):
+            if not directory:
+                continue
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if _PYTHON_EXE_RE.match(entry.name) and (_IS_WINDOWS or os.access(entry.path, os.X_OK)):
+                            add_path(entry.path)
+            except OSError:
+                continue
+
+        if _IS_WINDOWS:
+            # 注册表中记录了所有已安装的 Python 版本 (PEP 514)
+            for python_exe, version in self._find_registered_pythons():
+                add_path(python_exe)
+                if version and os.path.isfile(python_exe):
+                    _PYTHON_VERSION_CACHE.setdefault(os.path.normcase(os.path.realpath(python_exe)), version)
+
+            # 针对Windows，可能还需要检查Python Launcher路径（Program Files 及用户级安装目录）
+            # os.scandir 的 DirEntry 自带类型信息，无需为每个候选目录额外 stat
+            install_roots = [os.environ.get("ProgramFiles", "C:\\Program Files")]
+            if os.environ.get("LOCALAPPDATA"):
+                install_roots.append(os.path.join(os.environ["LOCALAPPDATA"], "Programs", "Python"))
+            for install_root in install_roots:
+                try:
+                    with os.scandir(install_root) as it:
+                        for entry in it:
+                            if entry.name.startswith("Python") and entry.is_dir(follow_symlinks=False):
+                                add_path(os.path.join(entry.path, "python.exe"))
+                except OSError:
+                    continue
         
         return paths
+
+    def _find_registered_pythons(self):
+        """从 Windows 注册表 (SOFTWARE\\Python\\PythonCore) 读取已安装的 Python，返回 [(python.exe路径, 版本或None)]"""
+        import winreg
+
+        found = []
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                core_key = winreg.OpenKey(hive, r"SOFTWARE\Python\PythonCore")
+            except OSError:
+                continue
+            with core_key:
+                index = 0
+                while True:
+                    try:
+                        tag = winreg.EnumKey(core_key, index)
+                    except OSError:
+                        break
+                    index += 1
+                    try:
+                        with winreg.OpenKey(core_key, tag + r"\InstallPath") as install_key:
+                            try:
+                                python_exe = winreg.QueryValueEx(install_key, "ExecutablePath")[0]
+                            except OSError:
+                                python_exe = os.path.join(winreg.QueryValueEx(install_key, "")[0], "python.exe")
+                    except OSError:
+                        continue
+                    version = None
+                    try:
+                        with winreg.OpenKey(core_key, tag) as tag_key:
+                            version = winreg.QueryValueEx(tag_key, "Version")[0]
+                    except OSError:
+                        pass
+                    found.append((python_exe, version))
+        return found
     
     def get_python_version(self, python_path):
-        """获取指定Python路径的版本"""
+        """获取指定Python路径的版本（优先从 pyvenv.cfg 和路径名推断，结果按真实路径缓存）"""
+        cache_key = os.path.normcase(os.path.realpath(python_path))
+        version = _PYTHON_VERSION_CACHE.get(cache_key)
+        if version:
+            return version
+
+        version = self._guess_python_version(python_path) or self._probe_python_version(python_path)
+        if version:
+            _PYTHON_VERSION_CACHE[cache_key] = version
+        return version
+
+    def _probe_python_version(self, python_path):
+        """启动解释器直接输出 sys.version_info；超时 2 秒，避免异常的解释器（如应用商店占位程序）卡住检测"""
         try:
-            output = subprocess.check_output([python_path, "-V"], text=True, stderr=subprocess.STDOUT)
-            return output.strip().split()[1]  # 通常返回类似 "Python 3.9.0" 的结果
-        except:
+            result = subprocess.run(
+                [python_path, "-c", "import sys;print('.'.join(map(str,sys.version_info[:3])))"],
+                capture_output=True,
+                text=True,
+                timeout=2,
+            )
+        except (OSError, subprocess.TimeoutExpired):
             return None
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def _guess_python_version(self, python_path):
+        """不启动解释器，从 pyvenv.cfg、文件名 (python3.12) 或安装目录名 (Python312) 推断版本"""
+        exe = Path(python_path)
+        # 虚拟环境: pyvenv.cfg 位于 bin/Scripts 的上一级目录
+        for cfg in (exe.parent / "pyvenv.cfg", exe.parent.parent / "pyvenv.cfg"):
+            try:
+                with open(cfg, encoding="utf-8") as f:
+                    for line in f:
+                        key, sep, value = line.partition("=")
+                        if sep and key.strip() in ("version", "version_info"):
+                            return ".".join(value.strip().split(".")[:3])
+            except OSError:
+                continue
+
+        match = re.match(r"^python(\d)\.(\d+)$", exe.name) or re.match(r"^python(\d)(\d+)", exe.parent.name, re.IGNORECASE)
+        if match:
+            return f"{match.group(1)}.{match.group(2)}"
+        return None
     
     def update_status(self, message, show_progress=True):
         """更新状态区域"""
         self.status_text.value = message
         self.progress_bar.visible = show_progress
-        self.status_text.update()
-        self.progress_bar.update()
+        self._request_ui_update()
     
     def download_python(self, e):
         """下载Python安装包"""
         def do_download():
             self.download_button.disabled = True
             self.update_status("正在下载Python 3.12.8安装包...", show_progress=True)
-            self.page.update()
+            self._request_ui_update()
             
             # 确定系统架构
             is_64bit = platform.architecture()[0] == "64bit"
@@ -299,18 +484,40 @@ class PythonInstallerApp:
             # 下载文件
             installer_path = "python-3.12.8-installer.exe"
             try:
-                opener = urllib.request.build_opener()
-                opener.addheaders = [('User-agent', 'Mozilla/5.0')]
-                urllib.request.install_opener(opener)
-                
-                def reporthook(blocknum, blocksize, totalsize):
-                    readsofar = blocknum * blocksize
-                    if totalsize > 0:
-                        percent = readsofar * 100 / totalsize
-                        self.progress_bar.value = percent / 100
-                        self.progress_bar.update()
-                    
-                urllib.request.urlretrieve(url, installer_path, reporthook)
+                headers = {'User-agent': 'Mozilla/5.0'}
+                received = [0] * 4  # 每个分段已下载的字节数，由各自的下载线程累加
+                totalsize = self._probe_download_size(url, headers)
+                download_done = threading.Event()
+
+                def poll_progress():
+                    # 独立线程每 100ms 汇总一次下载进度，下载吞吐与界面刷新频率互不影响
+                    while not download_done.wait(0.1):
+                        if totalsize > 0:
+                            self.progress_bar.value = sum(received) / totalsize
+                            self._request_ui_update()
+
+                progress_thread = threading.Thread(target=poll_progress, daemon=True)
+                progress_thread.start()
+                try:
+                    if not (totalsize > 0 and self._download_ranges(url, headers, installer_path, totalsize, received)):
+                        # 服务器不支持分段下载，退回单连接下载
+                        received[:] = [0] * len(received)
+                        request = urllib.request.Request(url, headers=headers)
+                        with urllib.request.urlopen(request, timeout=30) as response, open(installer_path, "wb") as f:
+                            totalsize = int(response.headers.get("Content-Length") or 0)
+                            while True:
+                                # 1 MiB 缓冲：大块写入直接穿过文件对象的缓冲区，减少拷贝和循环次数
+                                chunk = response.read(1024 * 1024)
+                                if not chunk:
+                                    break
+                                f.write(chunk)
+                                received[0] += len(chunk)
+                finally:
+                    download_done.set()
+                    progress_thread.join()
+                if totalsize > 0:
+                    self.progress_bar.value = 1
+                    self._request_ui_update()
                 
                 self.add_log(f"✅ 下载完成: {installer_path}", color="green")
                 self.update_status("Python安装包下载完成，请点击安装按钮", show_progress=False)
@@ -321,11 +528,58 @@ class PythonInstallerApp:
                 self.update_status("下载失败，请检查网络连接", show_progress=False)
                 self.download_button.disabled = False
             
-            self.page.update()
+            self._request_ui_update()
         
         # 在后台线程运行下载
         threading.Thread(target=do_download).start()
     
+    def _probe_download_size(self, url, headers):
+        """通过 HEAD 请求获取文件大小；服务器明确不支持 Range 或请求失败时返回 0"""
+        try:
+            request = urllib.request.Request(url, headers=headers, method="HEAD")
+            with urllib.request.urlopen(request, timeout=30) as response:
+                if response.headers.get("Accept-Ranges", "").lower() == "none":
+                    return 0
+                return int(response.headers.get("Content-Length") or 0)
+        except Exception:
+            return 0
+
+    def _download_ranges(self, url, headers, path, totalsize, received):
+        """
+        将文件按 len(received) 分段，用多个连接并发下载 (HTTP Range)，各段写入预分配文件的对应偏移。
+        服务器未返回 206 (不支持分段) 时返回 False，由调用方退回单连接下载。
+        """
+        part_size = -(-totalsize // len(received))  # 向上取整
+        parts = [
+            (index, start, min(start + part_size, totalsize) - 1)
+            for index, start in enumerate(range(0, totalsize, part_size))
+        ]
+        with open(path, "wb") as f:
+            f.truncate(totalsize)  # 预分配文件大小，各段直接写入对应位置
+
+        def fetch_part(part):
+            index, start, end = part
+            request = urllib.request.Request(url, headers={**headers, "Range": f"bytes={start}-{end}"})
+            with urllib.request.urlopen(request, timeout=30) as response:
+                if response.status != 206:
+                    return False
+                with open(path, "r+b") as f:
+                    f.seek(start)
+                    while True:
+                        chunk = response.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        received[index] += len(chunk)
+            return True
+
+        with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            if not all(list(executor.map(fetch_part, parts))):
+                return False
+        if sum(received) != totalsize:
+            raise IOError(f"分段下载大小不一致: {sum(received)}/{totalsize}")
+        return True
+
     def run_installer(self, e):
         """运行Python安装程序"""
         installer_path = "python-3.12.8-installer.exe"
@@ -337,7 +591,7 @@ class PythonInstallerApp:
         self.add_log("提示: 安装时请勾选 'Add Python 3.12 to PATH' 选项", color="blue")
         
         try:
-            if platform.system() == "Windows":
+            if _IS_WINDOWS:
                 os.startfile(installer_path)
                 self.add_log("安装程序已启动，请按照向导完成安装")
                 self.add_log("安装完成后，请点击刷新按钮重新检测环境", color="orange")
@@ -351,7 +605,7 @@ class PythonInstallerApp:
         def do_create_venv():
             self.create_venv_button.disabled = True
             self.update_status("正在创建虚拟环境...", show_progress=True)
-            self.page.update()
+            self._request_ui_update()
             
             self.add_log("开始创建虚拟环境...")
             
@@ -369,30 +623,43 @@ class PythonInstallerApp:
                 self.add_log("❌ 未找到Python 3.12.x，无法创建虚拟环境", color="red")
                 self.update_status("创建虚拟环境失败", show_progress=False)
                 self.create_venv_button.disabled = False
-                self.page.update()
+                self._request_ui_update()
                 return
             
             # 如果已有venv目录，先删除
             venv_path = Path("venv")
             if venv_path.exists():
                 self.add_log("移除现有的虚拟环境...")
-                import shutil
-                shutil.rmtree("venv")
+                _fast_rmtree("venv")
             
             # 创建虚拟环境
             self.add_log(f"使用 {python312_path} 创建虚拟环境...")
             
-            # 运行venv模块创建虚拟环境
-            process = subprocess.Popen(
-                [python312_path, "-m", "venv", "venv"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            stdout, stderr = process.communicate()
+            if not getattr(sys, "frozen", False) and os.path.realpath(python312_path) == os.path.realpath(sys.executable):
+                # 目标就是当前运行的解释器：直接在进程内创建，省去一次 Python 解释器启动
+                try:
+                    venv.EnvBuilder(with_pip=True, symlinks=not _IS_WINDOWS).create("venv")
+                    returncode, stderr = 0, ""
+                except Exception as ex:
+                    returncode, stderr = 1, str(ex)
+            else:
+                # 运行venv模块创建虚拟环境（只需要失败时的 stderr，不捕获 stdout）
+                process = subprocess.Popen(
+                    [python312_path, "-m", "venv", "venv"],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
+                
+                try:
+                    _, stderr = process.communicate(timeout=120)
+                    returncode = process.returncode
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.communicate()
+                    returncode, stderr = 1, "创建虚拟环境超时"
             
-            if process.returncode == 0:
+            if returncode == 0:
                 self.add_log("✅ 虚拟环境创建成功", color="green")
                 self.update_status("虚拟环境已创建，现在可以安装依赖", show_progress=False)
                 
@@ -411,14 +678,14 @@ class PythonInstallerApp:
                     actions_alignment=ft.MainAxisAlignment.END,
                 )
                 self.page.dialog.open = True
-                self.page.update()
+                self._request_ui_update()
             else:
                 error_msg = stderr or "未知错误"
                 self.add_log(f"❌ 创建虚拟环境失败: {error_msg}", color="red")
                 self.update_status("创建虚拟环境失败", show_progress=False)
                 self.create_venv_button.disabled = False
             
-            self.page.update()
+            self._request_ui_update()
         
         # 在后台线程运行
         threading.Thread(target=do_create_venv).start()
@@ -458,7 +725,7 @@ class PythonInstallerApp:
     def install_requirements(self, req_file_path):
         """安装requirements.txt中的依赖"""
         self.install_req_button.disabled = True
-        self.install_req_button.update()
+        self._request_ui_update()
         
         self.update_status(f"正在安装依赖: {os.path.basename(req_file_path)}...", show_progress=True)
         self.add_log(f"开始安装依赖: {req_file_path}")
@@ -536,75 +803,99 @@ class PythonInstallerApp:
         """执行依赖安装"""
         self.add_log(f"使用pip源: {pip_index_url}")
         
-        # 获取python路径
-        if platform.system() == "Windows":
-            venv_python = os.path.abspath("venv/Scripts/python.exe")
-            venv_pip = os.path.abspath("venv/Scripts/pip.exe")
-        else:
-            venv_python = os.path.abspath("venv/bin/python")
-            venv_pip = os.path.abspath("venv/bin/pip")
-        
-        # 更新pip
-        self.add_log("正在更新pip...")
-        upgrade_cmd = [
-            venv_python, "-m", "pip", "install", 
-            "-i", pip_index_url, 
-            "--upgrade", "pip"
-        ]
-        
-        process = subprocess.Popen(
-            upgrade_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        stdout, stderr = process.communicate()
+        venv_python = self.venv_python
+        venv_pip = self.venv_pip
         
-        if process.returncode == 0:
-            self.add_log("✅ pip更新成功", color="green")
+        # 系统中有 uv 时优先使用：并行下载、原生解析依赖，比 pip 快得多
+        uv_path = shutil.which("uv")
+
+        if uv_path:
+            self.add_log(f"检测到 uv，使用 uv 安装依赖: {uv_path}")
         else:
-            self.add_log(f"⚠️ pip更新可能未成功完成: {stderr}", color="orange")
+            # 更新pip（uv 不依赖虚拟环境中的 pip，无需更新）
+            self.add_log("正在更新pip...")
+            upgrade_cmd = [
+                venv_python, "-m", "pip", "install", 
+                "-i", pip_index_url, 
+                "--upgrade", "pip"
+            ]
+            
+            process = subprocess.Popen(
+                upgrade_cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            
+            stdout, stderr = process.communicate()
+            
+            if process.returncode == 0:
+                self.add_log("✅ pip更新成功", color="green")
+            else:
+                self.add_log(f"⚠️ pip更新可能未成功完成: {stderr}", color="orange")
         
         # 安装依赖
         self.add_log(f"开始安装依赖: {req_file_path}...")
         self.update_status("正在安装依赖，这可能需要几分钟...", show_progress=True)
         
-        install_cmd = [
-            venv_pip, "install", 
-            "-i", pip_index_url, 
-            "-r", req_file_path
-        ]
+        if uv_path:
+            install_cmd = [
+                uv_path, "pip", "install",
+                "--python", venv_python,
+                "-i", pip_index_url,
+                "--color", "never", "--no-progress",
+                "-r", req_file_path
+            ]
+            line_re = _UV_LINE_RE
+        else:
+            self.add_log(f"完整安装日志: {os.path.abspath('pip_install.log')}")
+            install_cmd = [
+                venv_pip, "install", 
+                "-i", pip_index_url, 
+                # 关闭颜色和进度条，大幅减少需要读取和过滤的输出量；完整输出写入日志文件
+                "--no-color", "--progress-bar", "off", "--disable-pip-version-check",
+                "--log", os.path.abspath("pip_install.log"),
+                "-r", req_file_path
+            ]
+            line_re = _PIP_LINE_RE
         
         process = subprocess.Popen(
             install_cmd,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            # uv 的所有信息都输出到 stderr，合并到 stdout 一起读取，避免 stderr 管道写满阻塞
+            stderr=subprocess.STDOUT if uv_path else subprocess.PIPE,
             text=True,
-            bufsize=1,  # 行缓冲
-            universal_newlines=True
+            bufsize=65536,
         )
         
-        # 实时读取输出
-        for line in process.stdout:
-            line = line.strip()
-            if line:
-                if "ERROR" in line:
-                    self.add_log(line, color="red")
-                elif "WARNING" in line:
-                    self.add_log(line, color="orange")
-                elif "Successfully installed" in line:
-                    self.add_log(line, color="green")
-                else:
-                    # 过滤掉一些不太重要的输出
-                    if not line.startswith("Requirement already satisfied"):
-                        self.add_log(line)
+        # 实时读取输出：按块读取字节流后自行切分行，避免逐行读取的系统调用开销
+        raw_stdout = process.stdout.buffer
+        decoder = codecs.getincrementaldecoder(process.stdout.encoding)(errors="replace")
+        tail = ""
+        while True:
+            chunk = raw_stdout.read1(8192)
+            if chunk:
+                lines = (tail + decoder.decode(chunk)).split("\n")
+                tail = lines.pop()  # 最后一段可能是不完整的行
+            else:
+                lines = [tail + decoder.decode(b"", final=True)]
+            # 同一块读取到的所有行合并为一批日志
+            entries = []
+            for line in lines:
+                # 一次正则匹配同时完成过滤和分类，只把重要的行发送到界面
+                line = line.strip()
+                match = line_re.match(line)
+                if match:
+                    entries.append((line, _LINE_COLORS.get(match.lastgroup, "black")))
+            self.add_logs(entries)
+            if not chunk:
+                break
         
         # 确保进程完成
         returncode = process.wait()
         
-        # 读取stderr
-        stderr = process.stderr.read()
+        # 读取stderr（使用 uv 时已合并到上方输出中）
+        stderr = process.stderr.read() if process.stderr else "详见上方日志"
         
         if returncode == 0:
             self.add_log("✅ 依赖安装成功！", color="green")
@@ -626,7 +917,7 @@ class PythonInstallerApp:
         
         # 启用按钮
         self.install_req_button.disabled = False
-        self.page.update()
+        self._request_ui_update()
 
 
 def show_python_installer(page: ft.Page, on_close_callback=None):
@@ -1,14 +1,33 @@
 import flet as ft
 import subprocess
-import queue
-import threading
-from typing import Optional, List, Dict, Any
+import asyncio
+from collections import deque
+from typing import Optional, List, Dict, Any, Deque, Tuple
 from dataclasses import dataclass, field
 
 # 从 flet_interest_monitor 导入，如果需要类型提示
 from .flet_interest_monitor import InterestMonitorDisplay
 
 
+class OutputBuffer:
+    """
+    Line buffer between a process's output pump and its processor loop.
+    Both run on the page's event loop, so the pump just appends and sets has_data;
+    the processor loop drains whatever accumulated in one batch.
+    """
+
+    def __init__(self, maxlen: int = 10000):
+        # maxlen 提供背压：UI 卡顿时自动丢弃最旧的行，避免内存无限增长
+        # 元素为 (是否含颜色标记, 行文本)；None 表示输出流结束
+        self.lines: Deque[Optional[Tuple[bool, str]]] = deque(maxlen=maxlen)
+        self.has_data: asyncio.Event = asyncio.Event()
+
+    def put(self, line: Optional[Tuple[bool, str]]):
+        """Appends a line (None signals end of stream). Must be called on the event loop."""
+        self.lines.append(line)
+        self.has_data.set()
+
+
 @dataclass
 class ManagedProcessState:
     """Holds the state for a single managed background process."""
@@ -18,8 +37,8 @@ class ManagedProcessState:
     display_name: str
     process_handle: Optional[subprocess.Popen] = None
     pid: Optional[int] = None
-    output_queue: queue.Queue = field(default_factory=queue.Queue)
-    stop_event: threading.Event = field(default_factory=threading.Event)
+    output_queue: OutputBuffer = field(default_factory=OutputBuffer)
+    stop_event: asyncio.Event = field(default_factory=asyncio.Event)
     status: str = "stopped"  # e.g., "running", "stopped", "error"
     # Store UI references if needed later, e.g., for dedicated output views
     # output_view_controls: Optional[List[ft.Control]] = None
@@ -34,8 +53,8 @@ class AppState:
         # Process related state
         self.bot_process: Optional[subprocess.Popen] = None
         self.bot_pid: Optional[int] = None
-        self.output_queue: queue.Queue = queue.Queue()
-        self.stop_event: threading.Event = threading.Event()
+        self.output_queue: OutputBuffer = OutputBuffer()
+        self.stop_event: asyncio.Event = asyncio.Event()
         self.bot_script_path: str = ""  # 初始化为空字符串
 
         # UI related state
@@ -43,10 +62,12 @@ class AppState:
         self.console_action_button: Optional[ft.ElevatedButton] = None
         self.is_auto_scroll_enabled: bool = True  # 默认启用自动滚动
         self.manual_viewing: bool = False  # 手动观看模式标识，用于修复自动滚动关闭时的位移问题
+        self.active_console_id: Optional[str] = None  # 当前显示的控制台对应的进程ID（由路由变更设置）
         self.interest_monitor_control: Optional[InterestMonitorDisplay] = None
         self.is_python_dialog_opening: bool = False # Flag to prevent multiple dialogs
         self.needs_python_path_dialog: bool = False # NEW flag
         self.interest_monitoring_expanded: bool = True  # 默认为展开状态，您可以按需修改
+        self.debug_metrics_enabled: bool = False  # 是否定期记录进程输出处理的性能指标 (gui_config: debug_metrics)
 
         # Script directory (useful for paths)
         self.script_dir: str = ""  # Will be set during initialization in main.py
@@ -61,6 +82,7 @@ class AppState:
         self.lpmm_config: Dict[str, Any] = {}  # 用户自定义的 lpmm 配置，为空时使用默认配置
         
         self.adapter_paths: List[str] = []  # Specific list of adapter paths from config
+        self.adapters_view_refs: Dict[str, ft.Row] = {}  # 适配器视图中每个进程对应的行，用于局部刷新
 
         # --- Process Management State (NEW - For multi-process support) --- #
         self.managed_processes: Dict[str, ManagedProcessState] = {}
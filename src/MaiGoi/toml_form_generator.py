@@ -1,113 +1,290 @@
 import flet as ft
 import tomlkit
-from typing import Dict, Any, List, Optional, Union, Callable
+from loguru import logger
+from typing import Dict, Any, List, Optional, Union, Callable, Tuple, Mapping
+from types import MappingProxyType
 from pathlib import Path
+import os
 import time # Import time for debouncing
 import threading
+import functools
+import asyncio
+import re
 
 # --- Define callback type for saving ---
 # Takes config data and returns success boolean
 SaveCallback = Callable[[Dict[str, Any]], bool]
 
-def load_template_with_comments(template_filename: str = "bot_config_template.toml"):
-    """
-    加载指定的模板文件，保留所有注释。
+# 元数据节点的标志属性
+_METADATA_KEYS = ("describe", "important", "can_edit")
 
-    Args:
-        template_filename: 要加载的模板文件名 (相对于 template/ 目录)。
+# isinstance 用的类型元组，提前解析好避免热循环里反复查找 tomlkit 属性
+_TABLE_TYPES = (dict, tomlkit.items.Table)
+_SCALAR_TYPES = (str, int, float, bool)
 
-    Returns:
-        包含注释的TOML文档对象，如果失败则返回空文档。
-    """
-    try:
-        # 首先尝试从相对路径加载 (相对于项目根目录)
-        # 假设此脚本位于 src/MaiGoi/
-        base_path = Path(__file__).parent.parent.parent
-        template_path = base_path / "template" / template_filename
-
-        if template_path.exists():
-            print(f"找到模板文件: {template_path}")
-            with open(template_path, "r", encoding="utf-8") as f:
-                return tomlkit.parse(f.read())
+_EMPTY_COMMENT_INDEX: Mapping[str, str] = MappingProxyType({})
+
+# dict.get 的默认值，用来区分 "键不存在" 和 "值为 None"
+_MISSING = object()
+
+# 输入过程中的中间文本 ("1e"、"-" 等) 先用正则过滤掉，避免每次按键都走 float() 的异常路径
+_NUMBER_RE = re.compile(r"^\s*[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?\s*$")
+# 纯整数 (最常见的输入) 直接 int()，不经过 float，大整数也不会丢失精度
+_INT_RE = re.compile(r"^\s*[+-]?\d+\s*$")
+
+
+# 重要配置项的加粗标签样式。TextStyle 只是样式数据而不是控件，可以在多个控件间共享；
+# Divider 等控件只能有一个父控件，仍需每处新建
+_BOLD_LABEL_STYLE = ft.TextStyle(weight=ft.FontWeight.BOLD)
+
+# 构建表单时每个控件都要用到的图标/颜色/对齐常量，在模块加载时取一次，
+# 避免每建一个控件都走 ft.icons.XXX 这样的多级属性查找
+_ICON_EXPANDED = ft.icons.ARROW_DROP_DOWN
+_ICON_COLLAPSED = ft.icons.ARROW_RIGHT
+_ICON_INFO = ft.icons.INFO_OUTLINE
+_ICON_ADD = ft.icons.ADD
+_ICON_DELETE = ft.icons.DELETE_OUTLINE
+_COLOR_DESCRIPTION = ft.colors.SECONDARY
+_COLOR_IMPORTANT = ft.colors.PRIMARY
+_WEIGHT_BOLD = ft.FontWeight.BOLD
+_MAIN_START = ft.MainAxisAlignment.START
+_MAIN_SPACE_BETWEEN = ft.MainAxisAlignment.SPACE_BETWEEN
+_CROSS_CENTER = ft.CrossAxisAlignment.CENTER
+
+# 字符串超过这个长度 (或包含换行) 时用多行文本框
+_MULTILINE_THRESHOLD = 50
+
+# 每级缩进的像素数
+_INDENT_WIDTH = 20
+
+
+@functools.lru_cache(maxsize=16)
+def _indent_padding(indent: int) -> ft.Padding:
+    # Padding 和 TextStyle 一样只是样式数据，可以在同一缩进级别的所有字段之间共享；
+    # 占位用的 Container 是控件，只能有一个父控件，不能这样缓存
+    return ft.padding.only(left=indent * _INDENT_WIDTH)
+
+
+def _parse_number(text_value: str) -> Optional[Union[int, float]]:
+    """把文本转换为数字，整数值返回 int；不是合法数字时返回 None。"""
+    if _INT_RE.match(text_value):
+        return int(text_value)
+    if not _NUMBER_RE.match(text_value):
+        return None
+    num_value = float(text_value)
+    if num_value.is_integer():
+        return int(num_value)
+    return num_value
+
+
+# 首先尝试从相对路径加载 (相对于项目根目录)
+# 假设此脚本位于 src/MaiGoi/
+_TEMPLATE_DIR = Path(__file__).parent.parent.parent / "template"
+
+
+def _get_template_path(template_filename: str) -> Path:
+    return _TEMPLATE_DIR / template_filename
+
+
+def _template_cache_key(template_filename: str) -> Tuple[Path, int]:
+    """模板相关缓存的键 (路径, st_mtime_ns)，只需一次 stat；模板不存在时抛出 FileNotFoundError"""
+    template_path = _get_template_path(template_filename)
+    return template_path, template_path.stat().st_mtime_ns
+
+
+@functools.lru_cache(maxsize=8)
+def _read_template_text(template_path: Path, mtime_ns: int) -> str:
+    """以二进制读入模板并解码一次 (不经过文本模式的换行转换)，按 (路径, 修改时间) 缓存，同一版本的模板只读一次文件。"""
+    print(f"找到模板文件: {template_path}")
+    return template_path.read_bytes().decode("utf-8")
+
+
+def _split_dotted_key(key: str) -> List[str]:
+    """把 TOML 的点分隔键 (a."b.c".d) 拆成各级键名，去掉引号"""
+    parts: List[str] = []
+    current: List[str] = []
+    quote = None
+    for ch in key:
+        if quote:
+            if ch == quote:
+                quote = None
+            else:
+                current.append(ch)
+        elif ch in "\"'":
+            quote = ch
+        elif ch == ".":
+            parts.append("".join(current).strip())
+            current = []
         else:
-            print(f"警告: 模板文件不存在: {template_path}")
-            return tomlkit.document()
-    except Exception as e:
-        print(f"加载模板文件 '{template_filename}' 出错: {e}")
-        return tomlkit.document()
+            current.append(ch)
+    parts.append("".join(current).strip())
+    return parts
 
 
-def get_comment_for_key(template_doc, key_path: str) -> str:
+def _scan_toml_value(text: str, depth: int, ml_quote: Optional[str]) -> Tuple[int, Optional[str], Optional[str]]:
     """
-    获取指定键路径的注释 (修正版)
-
-    Args:
-        template_doc: 包含注释的TOML文档
-        key_path: 点分隔的键路径，例如 "bot.qq"
+    扫描一行 (或一行的剩余部分) 中的 TOML 值，跳过字符串，跟踪数组/内联表的嵌套层数。
 
     Returns:
-        该键对应的注释字符串，如果没有则返回空字符串
+        (扫描后的嵌套层数, 仍未闭合的多行字符串引号, 值之后的行内注释)；
+        注释只在值已结束 (层数为 0 且不在多行字符串中) 时返回，数组内部的注释不属于该键
+    """
+    i, n = 0, len(text)
+    while i < n:
+        if ml_quote:
+            end = text.find(ml_quote, i)
+            if end < 0:
+                return depth, ml_quote, None
+            i = end + 3
+            ml_quote = None
+            continue
+        ch = text[i]
+        if ch in "\"'":
+            if text.startswith(ch * 3, i):
+                ml_quote = ch * 3
+                i += 3
+                continue
+            # 单行字符串：基本字符串需要跳过转义字符，字面量字符串没有转义
+            i += 1
+            while i < n and text[i] != ch:
+                i += 2 if ch == '"' and text[i] == "\\" else 1
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+        elif ch == "#":
+            if depth == 0:
+                return depth, None, text[i:].lstrip("#").strip()
+            return depth, None, None
+        i += 1
+    return depth, ml_quote, None
+
+
+def extract_template_comments(text: str) -> Dict[str, str]:
     """
-    if not template_doc:
-        return ""
+    逐行扫描模板原文，生成 "点分隔路径 -> 行内注释" 的扁平字典，不需要完整解析 TOML。
 
+    与 tomlkit 的 trivia.comment 对应：表头行 ([a.b] # 注释) 的注释归该表，
+    键值行 (key = value # 注释，值可以跨行) 值之后的注释归该键；
+    单独成行的注释不属于任何键。[[数组表]] 中的键不会生成表单字段，直接跳过。
+    """
+    index: Dict[str, str] = {}
+    prefix: Optional[str] = ""
+    pending_path: Optional[str] = None  # 值跨行 (多行数组/字符串) 的键
+    depth, ml_quote = 0, None
+
+    for line in text.splitlines():
+        if pending_path is not None:
+            depth, ml_quote, comment = _scan_toml_value(line, depth, ml_quote)
+            if depth <= 0 and ml_quote is None:
+                if comment:
+                    index[pending_path] = comment
+                pending_path = None
+            continue
+
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        if stripped.startswith("["):
+            is_array_table = stripped.startswith("[[")
+            header_end = stripped.find("]]" if is_array_table else "]")
+            if header_end < 0:
+                continue
+            if is_array_table:
+                prefix = None
+                continue
+            prefix = ".".join(_split_dotted_key(stripped[1:header_end]))
+            _, _, comment = _scan_toml_value(stripped[header_end + 1:], 0, None)
+            if comment:
+                index[prefix] = comment
+            continue
+
+        if prefix is None:
+            continue
+        # 键里可能有带引号的 "="，跳过引号找真正的分隔符
+        key_end, quote = -1, None
+        for i, ch in enumerate(stripped):
+            if quote:
+                if ch == quote:
+                    quote = None
+            elif ch in "\"'":
+                quote = ch
+            elif ch == "=":
+                key_end = i
+                break
+        if key_end < 0:
+            continue
+        key = ".".join(_split_dotted_key(stripped[:key_end]))
+        path = f"{prefix}.{key}" if prefix else key
+
+        depth, ml_quote, comment = _scan_toml_value(stripped[key_end + 1:], 0, None)
+        if depth > 0 or ml_quote is not None:
+            pending_path = path
+        elif comment:
+            index[path] = comment
+
+    return index
+
+
+@functools.lru_cache(maxsize=8)
+def _get_comment_index(template_path: Path, mtime_ns: int) -> Mapping[str, str]:
+    # 注释索引直接扫描模板原文得到，不经过 tomlkit 解析
+    # 缓存的索引被所有表单共享，用只读视图包装，防止某个调用方改坏缓存
+    return MappingProxyType(extract_template_comments(_read_template_text(template_path, mtime_ns)))
+
+
+def get_template_comment_index(template_filename: str = "bot_config_template.toml") -> Mapping[str, str]:
+    """
+    获取指定模板的注释索引 (见 extract_template_comments)，按文件修改时间缓存。
+
+    Returns:
+        键路径到注释的只读映射，模板不存在时返回空映射。
+    """
     try:
-        parts = key_path.split(".")
-        current_item = template_doc
-
-        # 逐级导航到目标项或其父表
-        for i, part in enumerate(parts):
-            if part not in current_item:
-                print(f"警告: 路径部分 '{part}' 在 {'.'.join(parts[:i])} 中未找到")
-                return ""  # 路径不存在
-
-            # 如果是最后一个部分，我们找到了目标项
-            if i == len(parts) - 1:
-                target_item = current_item[part]
-
-                # --- 尝试从 trivia 获取注释 ---
-                if hasattr(target_item, "trivia") and hasattr(target_item.trivia, "comment"):
-                    comment_lines = target_item.trivia.comment.split("\n")
-                    # 去除每行的 '#' 和首尾空格
-                    cleaned_comment = "\n".join([line.strip().lstrip("#").strip() for line in comment_lines])
-                    if cleaned_comment:
-                        return cleaned_comment
-
-                # --- 如果是顶级表，也检查容器自身的 trivia ---
-                # (tomlkit 对于顶级表的注释存储方式可能略有不同)
-                if isinstance(target_item, (tomlkit.items.Table, tomlkit.container.Container)) and len(parts) == 1:
-                    if hasattr(target_item, "trivia") and hasattr(target_item.trivia, "comment"):
-                        comment_lines = target_item.trivia.comment.split("\n")
-                        cleaned_comment = "\n".join([line.strip().lstrip("#").strip() for line in comment_lines])
-                        if cleaned_comment:
-                            return cleaned_comment
-
-                # 如果 trivia 中没有，尝试一些旧版或不常用的属性 (风险较高)
-                # if hasattr(target_item, '_comment'): # 不推荐
-                #    return str(target_item._comment).strip(" #")
-
-                # 如果以上都找不到，返回空
-                return ""
-
-            # 继续导航到下一级
-            current_item = current_item[part]
-            # 如果中间路径不是表/字典，则无法继续
-            if not isinstance(current_item, (dict, tomlkit.items.Table, tomlkit.container.Container)):
-                print(f"警告: 路径部分 '{part}' 指向的不是表结构，无法继续导航")
-                return ""
-
-        return ""  # 理论上不应执行到这里，除非 key_path 为空
+        return _get_comment_index(*_template_cache_key(template_filename))
+    except FileNotFoundError:
+        return _EMPTY_COMMENT_INDEX
 
+
+def warm_template_cache(template_filename: str = "bot_config_template.toml") -> None:
+    """预先扫描模板并建立注释索引，填充缓存。可在创建表单前放到线程池中与读取配置并行执行，失败时只打印错误。"""
+    try:
+        get_template_comment_index(template_filename)
     except Exception as e:
-        # 打印更详细的错误信息，包括路径和异常类型
-        print(f"获取注释时发生意外错误 (路径: {key_path}): {type(e).__name__} - {e}")
-        # print(traceback.format_exc()) # 可选：打印完整堆栈跟踪
-        return ""
+        print(f"预加载模板 '{template_filename}' 出错: {e}")
 
 
 class TomlFormGenerator:
     """用于将TOML配置生成Flet表单控件并支持自动保存的类。"""
 
+    # 实例属性固定，用 __slots__ 省掉每个实例的 __dict__，热路径上的属性访问也更快。
+    # 新增实例属性时需要同时加到这里
+    __slots__ = (
+        "page",
+        "config_data",
+        "parent_container",
+        "controls_map",
+        "_leaf_refs",
+        "_value_change_handler",
+        "_number_change_handler",
+        "_section_toggle_handler",
+        "expanded_sections",
+        "save_callback",
+        "debounce_interval",
+        "last_change_time",
+        "_save_deadline",
+        "_save_pending",
+        "_save_lock",
+        "config_metadata",
+        "_flat_metadata",
+        "_metadata_cache",
+        "source_path",
+        "_source_mtime_ns",
+        "template_doc_comments",
+        "_template_ready",
+    )
+
     def __init__(
         self,
         page: ft.Page,
@@ -134,73 +311,133 @@ class TomlFormGenerator:
         self.config_data = config_data
         self.parent_container = parent_container
         self.controls_map = {}
+        # 路径 -> (父字典, 叶子键)，构建表单时记录，编辑时直接定位无需再遍历
+        self._leaf_refs: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        # 所有标量控件和部分标题的折叠按钮共用这些处理函数 (只绑定一次)，路径放在 control.data 中，不为每个字段创建闭包
+        self._value_change_handler = self._on_value_change
+        self._number_change_handler = self._on_number_change
+        self._section_toggle_handler = self._toggle_section
         self.expanded_sections = set()
         self.save_callback = save_callback # Store the save callback
         self.debounce_interval = debounce_interval
         self.last_change_time = 0
-        self.save_timer: Optional[threading.Timer] = None # For debouncing
+        # For debouncing: 保存截止时间 (time.monotonic) 和是否已有等待中的保存协程
+        # 同步事件处理函数在 Flet 的线程池中运行，所以仍用锁保护这两个字段
+        self._save_deadline: float = 0.0
+        self._save_pending = False
+        self._save_lock = threading.Lock()
+        # 元数据只读，直接共享调用方 (load_config_metadata 的缓存) 的对象，不做复制
         self.config_metadata = config_metadata or {} # 存储元数据
-
-        # 加载指定的模板文档
-        self.template_doc = load_template_with_comments(template_filename)
-
-        if not self.template_doc.value:
-            print(f"警告：加载的模板 '{template_filename}' 为空，注释功能将不可用。")
+        # 展开后的元数据和按路径解析的结果只取决于元数据对象本身，同一份元数据的所有表单共用
+        self._flat_metadata, self._metadata_cache = self._get_metadata_plan(self.config_metadata)
+        # 表单对应的配置文件及其构建时的 mtime，重新打开时 mtime 未变即可直接复用整个表单
+        self.source_path: Optional[Path] = None
+        self._source_mtime_ns: Optional[int] = None
+
+        # 模板只用于补充注释 (元数据的 describe 优先)，只需要注释索引，在后台线程扫描，
+        # 只有真正需要模板注释时 _get_comment 才会等待它完成
+        self.template_doc_comments: Mapping[str, str] = _EMPTY_COMMENT_INDEX
+        self._template_ready = threading.Event()
+        threading.Thread(target=self._load_template, args=(template_filename,), daemon=True).start()
+
+    def _load_template(self, template_filename: str):
+        """加载指定模板的注释索引 (在后台线程中运行)"""
+        try:
+            # 预先建立的注释索引，之后每次查找只是一次字典访问
+            self.template_doc_comments = get_template_comment_index(template_filename)
+            if not self.template_doc_comments:
+                print(f"警告：模板 '{template_filename}' 不存在或没有注释，注释功能将不可用。")
+        except Exception as e:
+            print(f"后台加载模板 '{template_filename}' 出错: {e}")
+        finally:
+            self._template_ready.set()
 
     def build_form(self):
         """构建整个表单。"""
         self.parent_container.controls.clear()
         self.controls_map.clear()  # 清空控件映射
+        self._leaf_refs.clear()
         # 使用 self.config_data 构建表单
         self._process_toml_section(self.config_data, self.parent_container)
 
-    def _get_metadata(self, key_path: str) -> Dict[str, Any]:
-        """获取指定键路径的元数据"""
+    def _record_source_mtime(self, mtime_ns: Optional[int] = None):
+        """记录配置文件的 mtime；mtime_ns 为 config_data 读取前观察到的值，省略时取当前值
+        (未指定文件或 stat 失败时清空，下次必然重建)"""
+        if self.source_path is None:
+            return
+        if mtime_ns is not None:
+            self._source_mtime_ns = mtime_ns
+            return
         try:
-            if not self.config_metadata:
-                return {}
-            
-            # 直接尝试获取元数据
-            if key_path in self.config_metadata:
-                return self.config_metadata[key_path]
-            
-            # 如果找不到，尝试递归查找
-            parts = key_path.split(".")
-            current = self.config_metadata
-            
-            for part in parts:
-                if isinstance(current, dict) and part in current:
-                    current = current[part]
-                else:
-                    # 如果找不到完整路径，尝试仅使用最后一部分
-                    if len(parts) > 1 and parts[-1] in self.config_metadata:
-                        return self.config_metadata[parts[-1]]
-                    return {}
-                
-            # 如果找到的是字典并且包含元数据属性，返回它
-            if isinstance(current, dict) and any(k in current for k in ["describe", "important", "can_edit"]):
-                return current
-            
-            return {}
-        except Exception as e:
-            print(f"获取元数据出错: {key_path}, {e}")
-            return {}
-
-    def _get_comment(self, key_path: str) -> str:
-        """获取指定键路径的注释，优先使用元数据中的描述"""
+            self._source_mtime_ns = os.stat(self.source_path).st_mtime_ns
+        except OSError:
+            self._source_mtime_ns = None
+
+    def is_source_unchanged(self, source_path: Union[str, Path]) -> bool:
+        """表单是否由同一个文件构建，且该文件自构建 (或上次自动保存) 后未在磁盘上变化"""
+        if self._source_mtime_ns is None or self.source_path != Path(source_path):
+            return False
         try:
-            # 首先尝试从元数据中获取描述
+            return os.stat(source_path).st_mtime_ns == self._source_mtime_ns
+        except OSError:
+            return False
+
+    def _get_metadata(self, key_path: str) -> Dict[str, Any]:
+        """获取指定键路径的元数据"""
+        if key_path in self._metadata_cache:
+            return self._metadata_cache[key_path]
+        metadata = self._lookup_metadata(key_path)
+        self._metadata_cache[key_path] = metadata
+        return metadata
+
+    def _lookup_metadata(self, key_path: str) -> Dict[str, Any]:
+        """在扁平化的元数据中查找指定键路径的元数据（未缓存）"""
+        metadata = self._flat_metadata.get(key_path)
+        if metadata is None and "." in key_path:
+            # 兼容只按最后一级键名书写的元数据
+            metadata = self._flat_metadata.get(key_path.rsplit(".", 1)[-1])
+        return metadata if metadata is not None else {}
+
+    @classmethod
+    def _get_metadata_plan(
+        cls, config_metadata: Dict[str, Any]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """返回 (展开的元数据, 按路径的解析缓存)。元数据是只读共享的，同一对象只展开一次"""
+        source, flat, resolved = cls._metadata_plan
+        if source is not config_metadata:
+            flat, resolved = cls._flatten_metadata(config_metadata), {}
+            # 保存源对象本身 (而不是 id)，保证比较的始终是同一个活着的对象
+            cls._metadata_plan = (config_metadata, flat, resolved)
+        return flat, resolved
+
+    @staticmethod
+    def _flatten_metadata(config_metadata: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """把嵌套的元数据展开为 {点分隔路径: 元数据字典}，只保留包含元数据属性的节点"""
+        flat: Dict[str, Dict[str, Any]] = {}
+        stack = [(config_metadata, "")]
+        while stack:
+            node, prefix = stack.pop()
+            for key, value in node.items():
+                if not isinstance(value, dict):
+                    continue
+                path = f"{prefix}.{key}" if prefix else key
+                if any(k in value for k in _METADATA_KEYS):
+                    flat[path] = value
+                stack.append((value, path))
+        return flat
+
+    def _get_comment(self, key_path: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        获取指定键路径的注释，优先使用元数据中的描述；两者都是预先建好的索引，只做字典查找。
+        调用方已经查过该路径的元数据时传入 metadata，避免重复查找。
+        """
+        if metadata is None:
             metadata = self._get_metadata(key_path)
-            if metadata and "describe" in metadata:
-                return metadata["describe"]
-            
-            # 如果没有元数据描述，则从模板中获取注释
-            comment = get_comment_for_key(self.template_doc, key_path)
-            if comment and isinstance(comment, str):
-                return comment
-        except Exception as e:
-            print(f"获取注释出错: {key_path}, {e}")
-        return ""  # 如果出现任何问题，返回空字符串
+        if "describe" in metadata:
+            return metadata["describe"]
+        # 如果没有元数据描述，则从模板注释索引中获取
+        self._template_ready.wait()
+        return self.template_doc_comments.get(key_path, "")
 
     def _process_toml_section(
         self,
@@ -230,59 +467,57 @@ class TomlFormGenerator:
         if not hasattr(container, "controls"):
             raise ValueError(f"传递给_process_toml_section的容器必须有controls属性，got: {type(container)}")
 
-        # 先处理所有子部分（嵌套表）
-        subsections = {}
-        simple_items = {}
+        # 一次遍历分离子部分（嵌套表）和简单值，存成 (键, 值) 列表
+        # 注意不能 unwrap：控件会原地修改这里拿到的列表/集合，必须是 section_data 中的原对象
+        subsections = []
+        simple_items = []
+        for item in section_data.items():
+            (subsections if isinstance(item[1], _TABLE_TYPES) else simple_items).append(item)
 
-        # 分离子部分和简单值
-        for key, value in section_data.items():
-            if isinstance(value, (dict, tomlkit.items.Table)):
-                subsections[key] = value
-            else:
-                simple_items[key] = value
+        # 每个简单值最多一行，每个子部分两行 (标题 + 容器)：按最终大小预分配，按下标填充，最后一次性接到容器上
+        rows: List[Optional[ft.Control]] = [None] * (len(simple_items) + 2 * len(subsections))
+        n_rows = 0
+
+        # 同一部分的字段缩进相同，共用一个 Padding
+        field_padding = _indent_padding(indent) if indent > 0 else None
 
         # 处理简单值
-        for key, value in simple_items.items():
+        for key, value in simple_items:
             full_path = f"{section_path}.{key}" if section_path else key
-            # 获取注释和元数据
-            comment = self._get_comment(full_path)
+            self._leaf_refs[full_path] = (section_data, key)
+            # 获取元数据和注释：每个路径的元数据只查一次，注释直接复用它
             metadata = self._get_metadata(full_path)
+            comment = self._get_comment(full_path, metadata)
             
             # 创建控件
-            control = self._create_control_for_value(key, value, full_path)
+            control = self._create_control_for_value(key, value, full_path, comment, metadata)
             
             if control:
-                # 创建控件容器
-                control_container = ft.Column([control], tight=True)
-                
-                # 如果有描述，添加描述文本
+                # 创建控件容器：控件、描述文本 (如果有)、分隔线，直接按最终内容构造
                 if comment:
                     description = ft.Text(
                         comment,
                         size=12,
-                        color=ft.colors.SECONDARY,
+                        color=_COLOR_DESCRIPTION,
                         italic=True,
                     )
-                    control_container.controls.append(description)
-                
-                # 添加分隔线
-                control_container.controls.append(ft.Divider(thickness=0.5))
+                    field_controls = [control, description, ft.Divider(thickness=0.5)]
+                else:
+                    field_controls = [control, ft.Divider(thickness=0.5)]
+                control_container = ft.Column(field_controls, tight=True)
                 
-                # 处理缩进
-                if indent > 0:
-                    row = ft.Row(
-                        [
-                            ft.Container(width=indent * 20),  # 每级缩进20像素
-                            control_container,
-                        ],
-                        alignment=ft.MainAxisAlignment.START,
+                # 处理缩进：用外层 Container 的左内边距代替 Row + 占位 Container，少建一个控件
+                if field_padding is not None:
+                    rows[n_rows] = ft.Container(
+                        content=control_container,
+                        padding=field_padding,  # 每级缩进 _INDENT_WIDTH 像素
                     )
-                    container.controls.append(row)
                 else:
-                    container.controls.append(control_container)
+                    rows[n_rows] = control_container
+                n_rows += 1
 
         # 处理子部分
-        for key, value in subsections.items():
+        for key, value in subsections:
             full_path = f"{section_path}.{key}" if section_path else key
 
             # 创建一个可展开/折叠的部分
@@ -291,90 +526,139 @@ class TomlFormGenerator:
             # 获取此部分的注释（安全获取）
             section_comment = self._get_comment(full_path)
 
+            # 创建子部分的容器
+            # 折叠的部分连内层 Column 也不创建，第一次展开时由 _process_toml_section 补上
+            subsection_container = ft.Container(visible=is_expanded)
+
             # 创建子部分的标题行
+            toggle_button = ft.IconButton(
+                icon=_ICON_EXPANDED if is_expanded else _ICON_COLLAPSED,
+                on_click=self._section_toggle_handler,
+                # _toggle_section 直接通过它找到要切换的容器和部分路径，不需要每个部分一个 lambda
+                data=(subsection_container, full_path),
+            )
             section_title_elems = [
-                ft.Container(width=indent * 20) if indent > 0 else ft.Container(width=0),
-                ft.IconButton(
-                    icon=ft.icons.ARROW_DROP_DOWN if is_expanded else ft.icons.ARROW_RIGHT,
-                    on_click=lambda e, path=full_path: self._toggle_section(e, path),
-                ),
-                ft.Text(key, weight=ft.FontWeight.BOLD, size=16),
+                toggle_button,
+                ft.Text(key, weight=_WEIGHT_BOLD, size=16),
             ]
+            if indent > 0:
+                # 顶层标题不再放一个宽度为 0 的占位 Container
+                section_title_elems.insert(0, ft.Container(width=indent * _INDENT_WIDTH))
 
             # 如果有注释，添加一个Info图标并设置tooltip
             if section_comment and len(section_comment) > 0:
                 try:
                     section_title_elems.append(
-                        ft.IconButton(icon=ft.icons.INFO_OUTLINE, tooltip=section_comment, icon_size=16)
+                        ft.IconButton(icon=_ICON_INFO, tooltip=section_comment, icon_size=16)
                     )
                 except Exception as e:
                     print(f"创建信息图标时出错: {full_path}, {e}")
 
             section_title = ft.Row(
                 section_title_elems,
-                alignment=ft.MainAxisAlignment.START,
-                vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                alignment=_MAIN_START,
+                vertical_alignment=_CROSS_CENTER,
             )
 
-            container.controls.append(section_title)
+            rows[n_rows] = section_title
+            rows[n_rows + 1] = subsection_container
+            n_rows += 2
 
-            # 创建子部分的容器
-            subsection_column = ft.Column([])
-            subsection_container = ft.Container(content=subsection_column, visible=is_expanded)
-            container.controls.append(subsection_container)
+            # 递归处理子部分；折叠的部分先不构建，记下参数等第一次展开时再构建
+            if is_expanded:
+                self._process_toml_section(
+                    value, subsection_container, full_path, indent + 1
+                )
+            else:
+                subsection_container.data = (value, full_path, indent + 1)
 
-            # 递归处理子部分
-            self._process_toml_section(
-                value, subsection_column, full_path, indent + 1
-            )
+        # 不支持的值类型不产生控件，去掉末尾未用的空位
+        del rows[n_rows:]
+        container.controls.extend(rows)
 
-    def _toggle_section(self, e, section_path):
-        """切换部分展开/折叠状态并强制刷新页面。"""
-        container = e.control.parent.parent.controls[e.control.parent.parent.controls.index(e.control.parent) + 1]
+    def _toggle_section(self, e):
+        """切换部分展开/折叠状态并刷新对应控件。"""
+        container, section_path = e.control.data
         if section_path in self.expanded_sections:
             self.expanded_sections.remove(section_path)
-            e.control.icon = ft.icons.ARROW_RIGHT
+            e.control.icon = _ICON_COLLAPSED
             container.visible = False
         else:
             self.expanded_sections.add(section_path)
-            e.control.icon = ft.icons.ARROW_DROP_DOWN
+            e.control.icon = _ICON_EXPANDED
             container.visible = True
+            if container.data is not None:
+                # 第一次展开：构建之前跳过的子部分控件
+                section_data, path, indent = container.data
+                container.data = None
+                self._process_toml_section(section_data, container, path, indent)
+
+        # 只刷新图标按钮和子部分容器，不必对整个页面做差异比较
+        self._refresh(e.control, container)
 
-        # 强制页面更新以反映可见性变化
-        self.page.update()
+    def _refresh(self, *controls: ft.Control):
+        """只把发生变化的控件 (及其子树) 的差异发给前端，而不是每次都对整个页面调用 update()"""
+        self.page.update(*controls)
 
     def _trigger_debounced_save(self):
         """Triggers the save callback after a debounce interval."""
         if not self.save_callback:
             return
 
-        # Cancel any existing timer
-        if self.save_timer:
-            self.save_timer.cancel()
-
-        # Define the function to be called by the timer
-        def save_action():
-            print(f"[Debounce] Triggering save callback at {time.time():.2f}")
-            self.save_callback(self.config_data)
-            self.save_timer = None # Clear timer after execution
-
-        # Schedule the save action
-        self.save_timer = threading.Timer(self.debounce_interval, save_action)
-        self.save_timer.start()
-        print(f"[Debounce] Save scheduled in {self.debounce_interval}s at {time.time():.2f}")
+        # 连续输入时只推后截止时间；同一时间最多一个在页面事件循环上等待的保存协程，不创建线程
+        with self._save_lock:
+            self._save_deadline = time.monotonic() + self.debounce_interval
+            if self._save_pending:
+                return
+            self._save_pending = True
+        self.page.run_task(self._debounced_save_async)
+        logger.debug("[Debounce] Save scheduled in {}s", self.debounce_interval)
+
+    async def _debounced_save_async(self):
+        """Waits on the page's event loop until the (possibly extended) deadline passes, then saves once."""
+        while True:
+            with self._save_lock:
+                remaining = self._save_deadline - time.monotonic()
+                if remaining <= 0:
+                    # 之后的修改会调度新的保存协程
+                    self._save_pending = False
+                    break
+            await asyncio.sleep(remaining)
+        logger.debug("[Debounce] Triggering save callback")
+        # 写文件放到默认线程池，避免阻塞页面事件循环
+        await asyncio.to_thread(self.save_callback, self.config_data)
+        # 自己写入导致的 mtime 变化不算外部修改，表单内容已与文件一致
+        self._record_source_mtime()
 
     def _update_config_value(self, path: str, new_value: Any):
         """更新配置字典中的值。"""
+        leaf_ref = self._leaf_refs.get(path)
+        if leaf_ref is not None:
+            parent, leaf = leaf_ref
+            # 只对标量做相等比较；容器由调用方原地修改，逐元素比较既慢又几乎总是不等。
+            # 用一次 get 代替 in + 取值 (tomlkit 容器的每次查找都是 Python 层的调用)；
+            # 字符串比较时 CPython 先比身份和长度，按键增删字符时不会逐字比较内容
+            if isinstance(new_value, _SCALAR_TYPES) and parent.get(leaf, _MISSING) == new_value:
+                return  # No change, do nothing
+            parent[leaf] = new_value
+            # 每次按键都会走到这里：用 loguru 的延迟格式化，未启用 debug 级别时不拼接字符串、不写控制台
+            logger.debug("[Config Update] Path: {}, New Value: {}", path, new_value)
+            self._trigger_debounced_save()
+            return
+
+        # 表单中未登记的路径，按路径逐级查找
         try:
             keys = path.split('.')
             data = self.config_data
             for i, key in enumerate(keys):
                 if i == len(keys) - 1:
+                    # 登记父字典引用，之后同一路径的编辑直接走上面的快速路径
+                    self._leaf_refs[path] = (data, key)
                     # Check if value actually changed to avoid unnecessary saves
                     if key in data and data[key] == new_value:
                         return # No change, do nothing
                     data[key] = new_value
-                    print(f"[Config Update] Path: {path}, New Value: {new_value}")
+                    logger.debug("[Config Update] Path: {}, New Value: {}", path, new_value)
                     # Trigger debounced save after updating the value
                     self._trigger_debounced_save()
                 else:
@@ -388,28 +672,46 @@ class TomlFormGenerator:
             import traceback
             traceback.print_exc()
 
-    def _create_control_for_value(self, key: str, value: Any, full_path: str) -> Optional[ft.Control]:
-        """为配置值创建对应的控件"""
-        # 获取注释和元数据
-        comment = self._get_comment(full_path)
-        metadata = self._get_metadata(full_path)
-        
+    def _on_value_change(self, e):
+        """布尔/字符串控件的 on_change：路径取自 control.data"""
+        self._update_config_value(e.control.data, e.control.value)
+
+    def _on_number_change(self, e):
+        """数字控件的 on_change：路径取自 control.data"""
+        self._handle_number_change(e.control.data, e.control.value)
+
+    def _create_control_for_value(
+        self, key: str, value: Any, full_path: str, comment: str, metadata: Dict[str, Any]
+    ) -> Optional[ft.Control]:
+        """为配置值创建对应的控件（注释和元数据由调用方查好传入）"""
+        # 根据值类型创建对应的控件：已见过的类型 (包括 tomlkit 的包装类型) 只需一次字典查找，
+        # 第一次遇到的类型才走 _get_control_factory 的 MRO 查找
+        value_type = type(value)
+        factories = self._CONTROL_FACTORIES
+        factory = factories[value_type] if value_type in factories else self._get_control_factory(value_type)
+        if factory is None:
+            return None
+
         # 检查是否可编辑
         can_edit = metadata.get("can_edit", True)
         important = metadata.get("important", False)
-        
-        # 根据值类型创建对应的控件
-        if isinstance(value, bool):
-            return self._create_boolean_control(key, value, full_path, comment, can_edit, important)
-        elif isinstance(value, (int, float)):
-            return self._create_number_control(key, value, full_path, comment, can_edit, important)
-        elif isinstance(value, str):
-            return self._create_string_control(key, value, full_path, comment, can_edit, important)
-        elif isinstance(value, list):
-            return self._create_list_control(key, value, full_path, comment, can_edit, important)
-        elif isinstance(value, set):
-            return self._create_set_control(key, value, full_path, comment, can_edit, important)
-        return None
+        return factory(self, key, value, full_path, comment, can_edit, important)
+
+    @classmethod
+    def _get_control_factory(cls, value_type: type) -> Optional[Callable[..., ft.Control]]:
+        """按值类型查找控件工厂；子类 (如 tomlkit 的 Integer/String/Array) 沿 MRO 查找后缓存"""
+        factories = cls._CONTROL_FACTORIES
+        try:
+            return factories[value_type]
+        except KeyError:
+            pass
+        factory = None
+        for base in value_type.__mro__[1:]:
+            if base in factories:
+                factory = factories[base]
+                break
+        factories[value_type] = factory
+        return factory
 
     def _create_boolean_control(self, key: str, value: bool, path: str, comment: str = "", can_edit: bool = True, important: bool = False) -> ft.Control:
         """创建布尔值控件"""
@@ -417,14 +719,15 @@ class TomlFormGenerator:
             label=key,
             value=value,
             disabled=not can_edit,
-            on_change=lambda e: self._update_config_value(path, e.control.value) if can_edit else None,
+            data=path,
+            on_change=self._value_change_handler if can_edit else None,
         )
         
         if comment:
             control.tooltip = comment
             
         if important:
-            control.label_style = ft.TextStyle(weight=ft.FontWeight.BOLD)
+            control.label_style = _BOLD_LABEL_STYLE
             
         return control
 
@@ -434,35 +737,35 @@ class TomlFormGenerator:
             label=key,
             value=str(value),
             disabled=not can_edit,
-            on_change=lambda e: self._handle_number_change(path, e.control.value) if can_edit else None,
+            data=path,
+            on_change=self._number_change_handler if can_edit else None,
         )
         
         if comment:
             control.tooltip = comment
             
         if important:
-            control.label_style = ft.TextStyle(weight=ft.FontWeight.BOLD)
+            control.label_style = _BOLD_LABEL_STYLE
             
         return control
 
     def _handle_number_change(self, path: str, text_value: str):
         """Handle changes for number TextFields, converting and validating."""
-        try:
-            # Try converting to float first, then int if possible
-            num_value = float(text_value)
-            if num_value.is_integer():
-                num_value = int(num_value)
-            self._update_config_value(path, num_value)
-        except ValueError:
+        # Convert to float first, then int if possible
+        num_value = _parse_number(text_value)
+        if num_value is None:
             # Handle invalid input (optional: show error, revert?)
-            print(f"Invalid number input for {path}: {text_value}")
+            # 输入过程中经常出现 ("-"、"1e" 等)，只记 debug
+            logger.debug("Invalid number input for {}: {}", path, text_value)
             # Maybe find the control and set error text?
             # control = self.controls_map.get(path)
             # if control: control.error_text = "请输入有效数字"
+            return
+        self._update_config_value(path, num_value)
 
     def _create_string_control(self, key: str, value: str, path: str, comment: str = "", can_edit: bool = True, important: bool = False) -> ft.Control:
         """创建字符串控件"""
-        is_multiline = len(value) > 50 or "\n" in value # 检查是否应该多行
+        is_multiline = len(value) > _MULTILINE_THRESHOLD or "\n" in value # 检查是否应该多行
         
         control = ft.TextField(
             label=key,
@@ -471,60 +774,53 @@ class TomlFormGenerator:
             min_lines=1 if not is_multiline else 3,
             max_lines=1 if not is_multiline else 8,
             disabled=not can_edit,
-            on_change=lambda e: self._update_config_value(path, e.control.value) if can_edit else None,
+            data=path,
+            on_change=self._value_change_handler if can_edit else None,
         )
         
         if comment:
             control.tooltip = comment
             
         if important:
-            control.label_style = ft.TextStyle(weight=ft.FontWeight.BOLD)
+            control.label_style = _BOLD_LABEL_STYLE
         
         return control
 
     def _create_list_control(self, key: str, value: List[Any], path: str, comment: str = "", can_edit: bool = True, important: bool = False) -> ft.Control:
         """为列表类型创建控件 (修改以支持自动保存)"""
         items_column = ft.Column([]) # Column to hold list item controls
-        list_item_controls = {} # Maps index to control
-
-        def update_list_value():
-            """更新配置数据中的列表值"""
-            updated_list = []
-            for i in range(len(list_item_controls)):
-                if i in list_item_controls and list_item_controls[i]:
-                    control = list_item_controls[i].controls[0] # Get the TextField
-                    if hasattr(control, "value"):
-                        try:
-                            # Try to convert numbers if possible
-                            item_value = control.value
-                            try:
-                                numeric_value = float(item_value)
-                                if numeric_value.is_integer():
-                                    item_value = int(numeric_value)
-                                else:
-                                    item_value = numeric_value
-                            except:
-                                pass # Not a number, keep as string
-                            updated_list.append(item_value)
-                        except Exception as e:
-                            print(f"Error getting value for list item {i}: {e}")
-            # Update the config data and trigger callback
-            self._update_config_value(path, updated_list)
+        # value 就是 config_data 中的列表对象，直接原地修改，每次编辑只转换改动的那一项
+        # items_column.controls 与 target_list 一一对应；每行的 data 记录它当前的下标 (已删除的行为 None)，
+        # 编辑时 O(1) 定位元素，只有删除时才需要更新其后各行的下标
+        target_list = value
+
+        def convert_item(item_value):
+            """Try to convert numbers if possible"""
+            numeric_value = _parse_number(item_value) if isinstance(item_value, str) else None
+            return item_value if numeric_value is None else numeric_value # Not a number, keep as string
 
         def on_item_change(e):
             """Handle changes for any item in the list"""
-            if can_edit:
-                update_list_value()
+            if not can_edit:
+                return
+            index = e.control.data.data
+            if index is None:
+                return # Row already deleted
+            new_value = convert_item(e.control.value)
+            if type(target_list[index]) is type(new_value) and target_list[index] == new_value:
+                return # No change
+            target_list[index] = new_value
+            self._trigger_debounced_save()
 
         # 创建标题和添加按钮行
         header_controls = [
-            ft.Text(key, weight=ft.FontWeight.BOLD),
+            ft.Text(key, weight=_WEIGHT_BOLD, color=_COLOR_IMPORTANT if important else None),
         ]
         
         # 仅在可编辑时添加按钮
         if can_edit:
             add_button = ft.IconButton(
-                icon=ft.icons.ADD,
+                icon=_ICON_ADD,
                 tooltip="添加新项",
                 on_click=lambda e: add_item(),
             )
@@ -533,16 +829,13 @@ class TomlFormGenerator:
         # 如果有注释，添加一个Info图标
         if comment:
             info_button = ft.IconButton(
-                icon=ft.icons.INFO_OUTLINE,
+                icon=_ICON_INFO,
                 tooltip=comment,
                 icon_size=16
             )
             header_controls.insert(1, info_button) # 在文本后、添加按钮前插入
-            
-        if important:
-            header_controls[0] = ft.Text(key, weight=ft.FontWeight.BOLD, color=ft.colors.PRIMARY)
         
-        header_row = ft.Row(header_controls, alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+        header_row = ft.Row(header_controls, alignment=_MAIN_SPACE_BETWEEN)
 
         def delete_item(e):
             """Deletes an item from the list UI and triggers update."""
@@ -550,31 +843,20 @@ class TomlFormGenerator:
                 return
             
             row_to_delete = e.control.data # Get the Row containing this button
-            if row_to_delete in items_column.controls:
-                index_to_delete = items_column.controls.index(row_to_delete)
-                items_column.controls.remove(row_to_delete)
-                
-                # Update our control map - shift all items after this one up
-                new_control_map = {}
-                for idx, control in list_item_controls.items():
-                    if idx < index_to_delete:
-                        new_control_map[idx] = control
-                    elif idx > index_to_delete:
-                        new_control_map[idx-1] = control
-                
-                list_item_controls.clear()
-                list_item_controls.update(new_control_map)
-                
-                update_list_value() # Update the stored list value
-                self.page.update() # Update UI immediately
-
-        def add_item(e=None, item_value="", is_initial=False):
-            """Adds a new item to the list UI (empty or with preset value)"""
-            if not can_edit and not is_initial:
-                return
-            
-            next_index = len(items_column.controls)
-            
+            index_to_delete = row_to_delete.data
+            if index_to_delete is None:
+                return # Row already deleted
+            del items_column.controls[index_to_delete]
+            del target_list[index_to_delete]
+            row_to_delete.data = None
+            for later_row in items_column.controls[index_to_delete:]:
+                later_row.data -= 1
+
+            self._trigger_debounced_save()
+            self._refresh(items_column) # Update UI immediately
+
+        def build_item_row(item_value, index: int) -> ft.Row:
+            """Creates the row (TextField + delete button) for one list item"""
             # Create a row with TextField and delete button
             item_controls = []
             
@@ -590,29 +872,37 @@ class TomlFormGenerator:
             # 仅在可编辑时添加删除按钮
             if can_edit:
                 delete_button = ft.IconButton(
-                    icon=ft.icons.DELETE_OUTLINE,
+                    icon=_ICON_DELETE,
                     on_click=delete_item,
                     tooltip="删除此项",
                 )
                 item_controls.append(delete_button)
             
-            item_row = ft.Row(item_controls, alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+            item_row = ft.Row(item_controls, alignment=_MAIN_SPACE_BETWEEN, data=index)
             
             # Store a reference to the delete button's parent row
             if can_edit and len(item_controls) > 1:
                 item_controls[1].data = item_row
             
-            # Add to our UI and control map
-            items_column.controls.append(item_row)
-            list_item_controls[next_index] = item_row
+            item_field.data = item_row # on_item_change 通过它找到所在行
+            return item_row
+
+        def add_item(e=None, item_value=""):
+            """Adds a new item to the list UI (empty or with preset value)"""
+            if not can_edit:
+                return
+            
+            item_row = build_item_row(item_value, len(items_column.controls))
             
-            if not is_initial:
-                self.page.update() # Update UI immediately
-                update_list_value() # Update the stored list
+            # Add to our UI and the stored list
+            items_column.controls.append(item_row)
+            target_list.append(convert_item(item_value))
+            self._refresh(items_column) # Update UI immediately
+            self._trigger_debounced_save()
 
-        # Populate with existing items
-        for item in value:
-            add_item(item_value=item, is_initial=True)
+        # Populate with existing items: 先建好所有行，再一次性挂到 Column 上
+        initial_rows = [build_item_row(item, index) for index, item in enumerate(value)]
+        items_column.controls.extend(initial_rows)
 
         # Assemble the container for the whole list control
         list_container = ft.Column([
@@ -625,38 +915,56 @@ class TomlFormGenerator:
     def _create_set_control(self, key: str, value: set, path: str, comment: str = "", can_edit: bool = True, important: bool = False) -> ft.Control:
         """为集合类型创建控件 (修改以支持自动保存)"""
         items_column = ft.Column([], spacing=2, scroll=ft.ScrollMode.ADAPTIVE)
-        set_item_controls = {} # Maps text value to Row control
-
-        def update_set_value():
-            """Update config with current set items"""
-            current_values = set(set_item_controls.keys())
-            self._update_config_value(path, current_values)
+        # value 就是 config_data 中的集合对象，增删时直接原地修改
+        target_set = value
+        set_item_controls = {} # Maps text value to (Row control, element in target_set)
 
         def delete_item(e):
             """Deletes an item from the set UI and triggers update."""
             if not can_edit:
                 return
             
+            # 按钮 data -> 所在行，行 data -> 文本，文本 -> (行, 原始元素)：全是直接引用，不需要按值扫描
             row_to_delete = e.control.data # The Row control stored in button's data
-            item_text_to_delete = None
-            # Find the text associated with this row
-            for text, row in set_item_controls.items():
-                if row == row_to_delete:
-                    item_text_to_delete = text
-                    break
+            item_text_to_delete = row_to_delete.data # The text stored in the row's data
 
-            if item_text_to_delete is not None and row_to_delete in items_column.controls:
+            if item_text_to_delete in set_item_controls:
+                # 按身份移除 (Control 没有重载 __eq__)，只剩列表本身的 C 级遍历
                 items_column.controls.remove(row_to_delete)
-                del set_item_controls[item_text_to_delete]
-                print(f"Deleted set item: {item_text_to_delete}")
-                update_set_value() # Update the set in config data
-                self.page.update() # Update UI immediately
+                _, element = set_item_controls.pop(item_text_to_delete)
+                target_set.discard(element)
+                logger.debug("Deleted set item: {}", item_text_to_delete)
+                self._trigger_debounced_save()
+                self._refresh(items_column) # Update UI immediately
             else:
-                print(f"Warning: Row/Item to delete not found for set {path}.")
+                logger.warning("Row/Item to delete not found for set {}.", path)
+
+        def build_item_row(text_to_add: str) -> ft.Row:
+            """Creates the row (text + delete button) for one set item"""
+            # Create a row with the item text and a delete button
+            item_display = ft.Text(text_to_add, size=14)
+            delete_btn = ft.IconButton(
+                icon=_ICON_DELETE,
+                tooltip="删除此项",
+                on_click=delete_item,
+            )
+            item_row = ft.Row(
+                [
+                    item_display,
+                    delete_btn,
+                ],
+                alignment=_MAIN_SPACE_BETWEEN,
+                vertical_alignment=_CROSS_CENTER,
+            )
+            
+            # Store reference to row for deletion handler
+            delete_btn.data = item_row
+            item_row.data = text_to_add
+            return item_row
 
         def add_item_from_field(e=None, item_text=""):
             """Adds item from text field or directly from provided text"""
-            if not can_edit and not item_text:
+            if not can_edit:
                 return
             
             # Get the text either from event or parameter
@@ -669,40 +977,25 @@ class TomlFormGenerator:
             
             # Skip if this exact text is already in the set
             if text_to_add in set_item_controls:
-                print(f"Item already exists in set: {text_to_add}")
+                logger.debug("Item already exists in set: {}", text_to_add)
                 return
             
-            # Create a row with the item text and a delete button
-            item_display = ft.Text(text_to_add, size=14)
-            delete_btn = ft.IconButton(
-                icon=ft.icons.DELETE_OUTLINE,
-                tooltip="删除此项",
-                on_click=delete_item,
-            )
-            item_row = ft.Row(
-                [
-                    item_display,
-                    delete_btn,
-                ],
-                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                vertical_alignment=ft.CrossAxisAlignment.CENTER,
-            )
-            
-            # Store reference to row for deletion handler
-            delete_btn.data = item_row
+            item_row = build_item_row(text_to_add)
             
             # Add to our maps and UI
             items_column.controls.append(item_row)
-            set_item_controls[text_to_add] = item_row
+            target_set.add(text_to_add)
+            set_item_controls[text_to_add] = (item_row, text_to_add)
             
             # If coming from text field, clear it
+            changed_controls = [items_column]
             if e and hasattr(e, "control") and hasattr(e.control, "value"):
                 e.control.value = ""
+                changed_controls.append(e.control)
             
             # Update data and UI
-            if not item_text: # Only update if not initial load
-                update_set_value()
-                self.page.update()
+            self._trigger_debounced_save()
+            self._refresh(*changed_controls)
 
         # Create add item fields
         input_field = ft.TextField(
@@ -712,7 +1005,7 @@ class TomlFormGenerator:
         )
         
         add_button = ft.IconButton(
-            icon=ft.icons.ADD,
+            icon=_ICON_ADD,
             on_click=lambda e: add_item_from_field(e),
             disabled=not can_edit,
         )
@@ -723,33 +1016,38 @@ class TomlFormGenerator:
         
         input_row = ft.Row(
             [input_field, add_button],
-            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            alignment=_MAIN_SPACE_BETWEEN,
         )
 
         # Populate existing items
+        # 先建好所有行，再一次性挂到 Column 上；同时记下原始元素以便删除
+        initial_rows = []
         for item in value:
-            add_item_from_field(item_text=str(item)) # Add initial items
+            item_text = str(item)
+            if not item_text or item_text in set_item_controls:
+                continue # Skip empty and duplicate items
+            item_row = build_item_row(item_text)
+            set_item_controls[item_text] = (item_row, item)
+            initial_rows.append(item_row)
+        items_column.controls.extend(initial_rows)
 
         # Create header row
         header_controls = [
-            ft.Text(key, weight=ft.FontWeight.BOLD),
+            ft.Text(key, weight=_WEIGHT_BOLD, color=_COLOR_IMPORTANT if important else None),
         ]
         
         # 如果有注释，添加一个Info图标
         if comment:
             info_button = ft.IconButton(
-                icon=ft.icons.INFO_OUTLINE,
+                icon=_ICON_INFO,
                 tooltip=comment,
                 icon_size=16
             )
             header_controls.append(info_button)
-            
-        if important:
-            header_controls[0] = ft.Text(key, weight=ft.FontWeight.BOLD, color=ft.colors.PRIMARY)
         
         header_row = ft.Row(
             header_controls, 
-            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+            alignment=_MAIN_SPACE_BETWEEN
         )
 
         # 组装完整容器
@@ -763,29 +1061,69 @@ class TomlFormGenerator:
 
         return set_container
 
+    # 最近一次使用的元数据及其 (展开结果, 按路径解析缓存)，见 _get_metadata_plan
+    _metadata_plan: Tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]] = (None, {}, {})
 
-def load_bot_config_template(app_state) -> Dict[str, Any]:
-    # Helper function to load bot_config template
-    # Assuming you have this logic already or can adapt it
-    template_doc = load_template_with_comments("bot_config_template.toml")
-    # Convert tomlkit doc to plain dict if needed
-    return dict(template_doc)
+    # 值类型 -> 控件创建方法 (未绑定函数，调用时传入 self)。
+    # 类定义时建好一次，所有实例共享；MRO 查找到的子类结果也缓存在这里
+    _CONTROL_FACTORIES: Dict[type, Optional[Callable[..., ft.Control]]] = {
+        bool: _create_boolean_control,
+        int: _create_number_control,
+        float: _create_number_control,
+        str: _create_string_control,
+        list: _create_list_control,
+        set: _create_set_control,
+    }
 
-def get_bot_config_path(app_state) -> Path:
-    # Helper to get the path, assuming config_manager can provide it
+
+@functools.lru_cache(maxsize=8)
+def _resolve_bot_config_path(base_dir: str) -> Path:
+    # 路径只取决于 base_dir，按 base_dir 缓存；切换 MMC 目录后自然使用新的缓存项
     from .config_manager import get_config_path
+
+    path = get_config_path("bot", base_dir=base_dir)
+    if not path:
+        raise FileNotFoundError(f"Could not determine path for bot_config.toml in {base_dir}/config/")
     
+    logger.debug("[toml_form_generator] 确定 bot_config.toml 路径: {}", path)
+    return path
+
+def get_bot_config_path(app_state) -> Path:
+    # Helper to get the path, assuming config_manager can provide it
     # 重要：使用 app_state.bot_base_dir 作为 base_dir 参数
     if not hasattr(app_state, 'bot_base_dir') or not app_state.bot_base_dir:
-        print("[toml_form_generator] Error: app_state.bot_base_dir 未设置，无法确定 bot_config.toml 路径")
+        logger.error("[toml_form_generator] app_state.bot_base_dir 未设置，无法确定 bot_config.toml 路径")
         raise ValueError("app_state.bot_base_dir is not set, cannot determine bot_config.toml path")
     
-    path = get_config_path("bot", base_dir=app_state.bot_base_dir)
-    if not path:
-        raise FileNotFoundError(f"Could not determine path for bot_config.toml in {app_state.bot_base_dir}/config/")
-    
-    print(f"[toml_form_generator] 确定 bot_config.toml 路径: {path}")
-    return path
+    return _resolve_bot_config_path(str(app_state.bot_base_dir))
+
+def _prefetch_file(path: Union[str, Path]) -> None:
+    """提示操作系统预读文件 (posix_fadvise WILLNEED，异步完成)；不支持的平台上用后台线程读一遍预热缓存。"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        return
+    except (AttributeError, OSError):
+        pass  # Windows/macOS 没有 posix_fadvise
+    finally:
+        os.close(fd)
+
+    def read_ahead():
+        try:
+            Path(path).read_bytes()
+        except OSError:
+            pass
+
+    threading.Thread(target=read_ahead, daemon=True).start()
+
+def prefetch_bot_config(app_state) -> None:
+    """提前把 bot_config.toml 读入系统页缓存，之后真正加载时不必等待磁盘。"""
+    if not getattr(app_state, 'bot_base_dir', None):
+        return
+    _prefetch_file(get_bot_config_path(app_state))
 
 def load_bot_config(app_state) -> Dict[str, Any]:
     """加载 Bot 配置文件 (bot_config.toml)"""
@@ -794,30 +1132,28 @@ def load_bot_config(app_state) -> Dict[str, Any]:
     try:
         # 直接使用 app_state.bot_base_dir 作为 base_dir 参数
         if not hasattr(app_state, 'bot_base_dir') or not app_state.bot_base_dir:
-            print("[toml_form_generator] Error: app_state.bot_base_dir 未设置，无法加载 bot_config.toml")
+            logger.error("[toml_form_generator] app_state.bot_base_dir 未设置，无法加载 bot_config.toml")
             raise ValueError("app_state.bot_base_dir is not set, cannot load bot_config.toml")
             
-        print(f"[toml_form_generator] 尝试从 {app_state.bot_base_dir}/config/ 加载 Bot 配置")
+        logger.debug("[toml_form_generator] 尝试从 {}/config/ 加载 Bot 配置", app_state.bot_base_dir)
         
         # 正确使用 app_state.bot_base_dir
         loaded_data = load_config(config_type="bot", base_dir=app_state.bot_base_dir)
 
         # 如果加载失败但没有抛出异常，提供更多信息
         if not loaded_data:
-            print(f"[toml_form_generator] 警告：Bot 配置文件加载成功但为空")
+            logger.warning("[toml_form_generator] Bot 配置文件加载成功但为空")
         else:
-            print(f"[toml_form_generator] 成功加载 Bot 配置，包含 {len(loaded_data)} 个顶级键")
+            # lazy=True: 只有 debug 级别实际输出时才计算键数量
+            logger.opt(lazy=True).debug("[toml_form_generator] 成功加载 Bot 配置，包含 {} 个顶级键", lambda: len(loaded_data))
 
         return loaded_data
 
     except FileNotFoundError as e:
-        print(f"[toml_form_generator] Bot 配置文件未找到: {e}, 返回空字典")
+        logger.warning("[toml_form_generator] Bot 配置文件未找到: {}, 返回空字典", e)
         return {}
     except Exception as e:
-        print(f"[toml_form_generator] 加载 Bot 配置文件时发生错误: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception("[toml_form_generator] 加载 Bot 配置文件时发生错误: {}", e)
         return {}
 
 # Updated function signature
@@ -829,8 +1165,25 @@ def create_toml_form(
     save_callback: Optional[SaveCallback] = None, # Pass save callback
     debounce_interval: float = 1.0, # Default debounce interval
     config_metadata: Optional[Dict[str, Any]] = None, # 配置元数据
+    source_path: Optional[Union[str, Path]] = None, # config_data 对应的配置文件
+    previous: Optional[TomlFormGenerator] = None, # 调用方已确认仍可复用的生成器
+    source_mtime_ns: Optional[int] = None, # 读取 config_data 之前 source_path 的 mtime
 ) -> TomlFormGenerator:
-    """创建TOML表单生成器实例"""
+    """创建TOML表单生成器实例；传入 previous 时直接复用它，跳过重建表单。
+
+    是否可复用由调用方在读取配置前用 previous.is_source_unchanged() 判断一次，这里不再重复检查，
+    避免两次检查之间文件变化时用旧数据建表单。source_mtime_ns 应在读取 config_data 之前取得，
+    读取期间文件若被修改，下次检查会发现不一致并重新加载。
+    """
+    if previous is not None:
+        if previous.parent_container is not container:
+            # 控件只能有一个父级，整体移到新容器中
+            container.controls[:] = previous.parent_container.controls
+            previous.parent_container.controls = []
+            previous.parent_container = container
+        logger.debug("[TomlForm] {} 未变化，复用已有表单", previous.source_path)
+        return previous
+
     generator = TomlFormGenerator(
         page=page,
         config_data=config_data,
@@ -841,4 +1194,7 @@ def create_toml_form(
         config_metadata=config_metadata, # 传递元数据
     )
     generator.build_form()
+    if source_path is not None:
+        generator.source_path = Path(source_path)
+        generator._record_source_mtime(source_mtime_ns)
     return generator
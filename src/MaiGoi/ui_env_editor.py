@@ -82,7 +82,11 @@ class EnvEditor(ft.Column):
 
         self.variables = load_env_data(self.env_path)
         self.debounce_interval = debounce_interval
-        self.save_timer: Optional[threading.Timer] = None
+        # 防抖：保存截止时间 (time.monotonic) 和当前等待中的保存线程。
+        # 连续输入只推后截止时间，一次连续编辑只启动一个线程，而不是每次按键新建一个 Timer
+        self._save_deadline: float = 0.0
+        self._save_worker: Optional[threading.Thread] = None
+        self._save_lock = threading.Lock()
 
         # UI Controls - Define them as instance attributes
         self.variable_rows_column = ft.Column([], spacing=5, scroll=ft.ScrollMode.ADAPTIVE)
@@ -241,16 +245,12 @@ class EnvEditor(ft.Column):
 
     def _trigger_debounced_save(self):
         """Triggers the save action after a debounce interval."""
-        if self.save_timer:
-            self.save_timer.cancel()
-
-        def save_action():
-            print(f"[Env Editor Debounce] Triggering save at {time.time():.2f}")
-            self._save_changes(silent=True)
-            self.save_timer = None
-
-        self.save_timer = threading.Timer(self.debounce_interval, save_action)
-        self.save_timer.start()
+        with self._save_lock:
+            self._save_deadline = time.monotonic() + self.debounce_interval
+            if self._save_worker is not None:
+                return  # 已有等待中的保存，它会等到新的截止时间
+            self._save_worker = threading.Thread(target=self._debounced_save_worker, daemon=True)
+            self._save_worker.start()
         print(f"[Env Editor Debounce] Save scheduled in {self.debounce_interval}s at {time.time():.2f}")
         # Update status immediately to show pending save
         self.status_text.value = "Saving..."
@@ -260,6 +260,19 @@ class EnvEditor(ft.Column):
         except Exception:
             pass # Ignore if update fails before mount
 
+    def _debounced_save_worker(self):
+        """Sleeps until the (possibly extended) deadline passes, then saves once."""
+        while True:
+            with self._save_lock:
+                remaining = self._save_deadline - time.monotonic()
+                if remaining <= 0:
+                    # 之后的修改会启动新的保存线程
+                    self._save_worker = None
+                    break
+            time.sleep(remaining)
+        print(f"[Env Editor Debounce] Triggering save at {time.time():.2f}")
+        self._save_changes(silent=True)
+
     def _save_changes(self, e=None, silent: bool = False):
         """Collects data from UI rows and saves to the .env file."""
         updated_variables = []
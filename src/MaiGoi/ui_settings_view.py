@@ -1,13 +1,21 @@
 import flet as ft
 import tomlkit
+import asyncio
+import functools
 from pathlib import Path
 import webbrowser  # 添加导入webbrowser模块用于打开网页
 from typing import Dict, Any
 
 from .state import AppState
 from .utils import show_snackbar  # Assuming show_snackbar is in utils
-from .toml_form_generator import create_toml_form, load_bot_config, get_bot_config_path
-from .config_manager import load_config, save_config
+from .toml_form_generator import (
+    create_toml_form,
+    load_bot_config,
+    get_bot_config_path,
+    prefetch_bot_config,
+    warm_template_cache,
+)
+from .config_manager import load_config, save_config, intern_keys
 from .ui_env_editor import create_env_editor_page_content, load_env_data
 from .db_connector import full_database_reset # 修改导入
 from .mmc_downloader import show_mmc_downloader  # 添加导入新模块
@@ -80,8 +88,15 @@ def save_gui_config_changes(page: ft.Page, app_state: AppState, silent: bool = F
         print("[Settings] Error during silent save of GUI Config.")
 
 
+@functools.lru_cache(maxsize=4)
+def _parse_config_metadata(meta_path: Path, mtime_ns: int) -> Dict[str, Any]:
+    # 按 (路径, mtime) 缓存；元数据只读不回写，转成普通 dict 并驻留键名 (每个字段都重复 describe 等键)
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return intern_keys(tomlkit.load(f).unwrap())
+
+
 def load_config_metadata(app_state: AppState) -> dict:
-    """加载配置元数据文件"""
+    """加载配置元数据文件 (返回共享的缓存对象，调用方只读不要修改)"""
     try:
         # 获取bot.py所在目录
         bot_dir = Path(app_state.mmc_path)
@@ -93,10 +108,9 @@ def load_config_metadata(app_state: AppState) -> dict:
             print(f"[Settings] 警告: 未找到配置元数据文件: {meta_path}")
             return {}
             
-        with open(meta_path, "r", encoding="utf-8") as f:
-            metadata = tomlkit.load(f)
-            print(f"[Settings] 成功加载配置元数据文件，包含 {len(metadata)} 个顶级键")
-            return metadata
+        metadata = _parse_config_metadata(meta_path, meta_path.stat().st_mtime_ns)
+        print(f"[Settings] 成功加载配置元数据文件，包含 {len(metadata)} 个顶级键")
+        return metadata
     except Exception as e:
         print(f"[Settings] 加载配置元数据文件时出错: {e}")
         import traceback
@@ -215,10 +229,13 @@ def create_important_settings_card(page: ft.Page, config_data: Dict[str, Any], c
 
 def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
     """Creates the settings view with sections for different config files."""
+    # 在构建界面的同时让系统预读 bot_config.toml，点开 Bot 配置编辑器时文件已在缓存中
+    prefetch_bot_config(app_state)
 
     # --- State for switching between editors ---
     content_area = ft.Column([], expand=True, scroll=ft.ScrollMode.ADAPTIVE)
     current_config_data = {}  # Store loaded data for saving
+    bot_form_generator = None  # 上次构建的 Bot 配置表单，文件未变化时直接复用
     
     # --- 添加下载MMC和安装Python按钮函数 --- #
     def download_mmc(e):
@@ -240,19 +257,47 @@ def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
             traceback.print_exc()
 
     # --- Function to load Bot config editor (Original TOML editor) ---
-    def show_bot_config_editor(e=None):
+    async def show_bot_config_editor(e=None):
         global CONFIG_NEEDS_REFRESH
-        nonlocal current_config_data
+        nonlocal current_config_data, bot_form_generator
         print("[Settings] Loading Bot Config Editor")
         try:
+            try:
+                config_path = get_bot_config_path(app_state)
+            except (ValueError, FileNotFoundError):
+                config_path = None
+            # 强制刷新时不复用上次的表单
+            previous_form = None if CONFIG_NEEDS_REFRESH else bot_form_generator
+            # 文件未变化时跳过重新解析，沿用表单持有的配置数据；只在这里判断一次
+            reuse_form = (
+                previous_form is not None
+                and config_path is not None
+                and previous_form.is_source_unchanged(config_path)
+            )
+            source_mtime_ns = None
+            if not reuse_form:
+                previous_form = None
+                # 在读取之前取 mtime，读取期间文件被外部修改时，下次进入会重新加载而不是复用旧数据
+                if config_path is not None:
+                    try:
+                        source_mtime_ns = config_path.stat().st_mtime_ns
+                    except OSError:
+                        pass
             # 检查是否需要强制刷新
             if CONFIG_NEEDS_REFRESH:
                 print("[Settings] 检测到配置变更，强制重新加载")
-                # 确保使用最新的 app_state.bot_base_dir
-                current_bot_config = load_config(config_type="bot", base_dir=app_state.bot_base_dir)
                 CONFIG_NEEDS_REFRESH = False  # 重置标记
-            else:
-                current_bot_config = load_config(config_type="bot", base_dir=app_state.bot_base_dir)
+
+            # 元数据、模板注释索引和配置文件互不依赖，在线程池中并行读取，不阻塞页面事件循环
+            loads = [
+                asyncio.to_thread(load_config_metadata, app_state),
+                asyncio.to_thread(warm_template_cache, "bot_config_template.toml"),
+            ]
+            if not reuse_form:
+                # 确保使用最新的 app_state.bot_base_dir
+                loads.append(asyncio.to_thread(load_config, config_type="bot", base_dir=app_state.bot_base_dir))
+            config_metadata, _, *loaded = await asyncio.gather(*loads)
+            current_bot_config = loaded[0] if loaded else previous_form.config_data
             
             if not current_bot_config:
                 if not app_state.bot_base_dir:
@@ -289,8 +334,6 @@ def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
             current_config_data = current_bot_config # Keep reference if needed elsewhere
             content_area.controls.clear()
 
-            # 加载配置元数据
-            config_metadata = load_config_metadata(app_state)
             print(f"[Settings] 加载的元数据: {config_metadata}")
 
             # Define the save callback for the bot config
@@ -308,8 +351,12 @@ def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
                 template_filename="bot_config_template.toml",
                 save_callback=bot_save_callback,
                 debounce_interval=1.5, # Optional: slightly longer debounce
-                config_metadata=config_metadata # 传递元数据
+                config_metadata=config_metadata, # 传递元数据
+                source_path=config_path,
+                previous=previous_form,
+                source_mtime_ns=source_mtime_ns,
             )
+            bot_form_generator = form_generator
             
             # 先创建重要设置卡片
             important_card = create_important_settings_card(page, current_bot_config, config_metadata)
@@ -574,11 +621,11 @@ def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
                             
                             # ---- 添加：重载配置文件 ---- #
                             # 1. 重载 bot_config.toml
-                            app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path)
+                            app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path, read_only=True)
                             print(f"[Settings] 重载 bot_config: {'成功' if app_state.bot_config else '失败'}")
                             
                             # 2. 重载 lpmm_config.toml
-                            app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path)
+                            app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path, read_only=True)
                             print(f"[Settings] 重载 lpmm_config: {'成功' if app_state.lpmm_config else '失败'}")
                             
                             # 3. 检查 .env 文件
@@ -600,8 +647,8 @@ def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
                             print(f"[Settings] mmc_path 和 bot_base_dir 已更新 (文件不存在): {app_state.mmc_path}")
                             
                             # 即使文件不存在，也尝试重载配置
-                            app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path)
-                            app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path)
+                            app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path, read_only=True)
+                            app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path, read_only=True)
                             full_database_reset(getattr(app_state, 'db', None))
                             
                             # 设置刷新标记
@@ -625,8 +672,8 @@ def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
                     print(f"[Settings] mmc_path 和 bot_base_dir 已重置: {app_state.mmc_path}")
                     
                     # ---- 添加：重载配置文件 ---- #
-                    app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path)
-                    app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path)
+                    app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path, read_only=True)
+                    app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path, read_only=True)
                     
                     full_database_reset(getattr(app_state, 'db', None)) 
                     
@@ -671,11 +718,11 @@ def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
                         
                         # ---- 添加：重载配置文件 ---- #
                         # 1. 重载 bot_config.toml
-                        app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path)
+                        app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path, read_only=True)
                         print(f"[Settings] 重载 bot_config: {'成功' if app_state.bot_config else '失败'}")
                         
                         # 2. 重载 lpmm_config.toml
-                        app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path)
+                        app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path, read_only=True)
                         print(f"[Settings] 重载 lpmm_config: {'成功' if app_state.lpmm_config else '失败'}")
                         
                         # 3. 检查 .env 文件
@@ -697,8 +744,8 @@ def create_settings_view(page: ft.Page, app_state: AppState) -> ft.View:
                         print(f"[Settings] 已直接更新 mmc_path 和 bot_base_dir (基于可能不存在的文件): {app_state.mmc_path}")
                         
                         # 即使文件不存在，也尝试重载配置
-                        app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path)
-                        app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path)
+                        app_state.bot_config = load_config(config_type="bot", base_dir=app_state.mmc_path, read_only=True)
+                        app_state.lpmm_config = load_config(config_type="lpmm", base_dir=app_state.mmc_path, read_only=True)
                         
                         full_database_reset(getattr(app_state, 'db', None))
                         
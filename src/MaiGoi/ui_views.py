@@ -3,6 +3,7 @@ from typing import Optional, TYPE_CHECKING
 import psutil
 import os
 import sys
+import functools
 from .utils import show_snackbar  # Removed run_script import
 from .meme_manager import build_meme_grid # <-- Import the new builder function
 
@@ -653,80 +654,87 @@ def create_adapters_view(page: ft.Page, app_state: "AppState") -> ft.View:
     
     adapters_list_view = ft.ListView(expand=True, spacing=5)
 
+    def build_adapter_row_controls(index: int, path: str, process_id: str) -> list:
+        """Builds the controls of one adapter row according to its current process status."""
+        # 检查进程状态
+        process_state = app_state.managed_processes.get(process_id)
+        is_running = False
+        if (
+            process_state
+            and process_state.status == "running"
+            and process_state.pid
+            and psutil.pid_exists(process_state.pid)
+        ):
+            is_running = True
+
+        action_buttons = []
+        if is_running:
+            # If running: View Output Button and Stop Button
+            action_buttons.append(
+                ft.IconButton(
+                    ft.icons.VISIBILITY_OUTLINED,
+                    tooltip="查看输出",
+                    data=process_id,  # 使用进程ID而非路径
+                    on_click=lambda e: page.go(f"/adapters/{e.control.data}"),
+                    icon_color=ft.colors.BLUE_GREY,  # Neutral color
+                )
+            )
+            action_buttons.append(
+                ft.IconButton(
+                    ft.icons.STOP_CIRCLE_OUTLINED,
+                    tooltip="停止此适配器",
+                    data=process_id,  # 使用进程ID而非路径
+                    # Call stop and then refresh the list view
+                    on_click=lambda e: (
+                        stop_managed_process(e.control.data, page, app_state),
+                        update_adapters_list(),
+                    ),
+                    icon_color=ft.colors.RED_ACCENT,
+                )
+            )
+        else:
+            # If stopped: Start Button
+            action_buttons.append(
+                ft.IconButton(
+                    ft.icons.PLAY_ARROW_OUTLINED,
+                    tooltip="启动此适配器脚本",
+                    data=path,  # 仍然需要传递路径以便正确启动
+                    on_click=lambda e: page.run_task(start_adapter_process, e, page, app_state),
+                    icon_color=ft.colors.GREEN,
+                )
+            )
+
+        return [
+            ft.Text(path, expand=True, overflow=ft.TextOverflow.ELLIPSIS),
+            # Add action buttons based on state
+            *action_buttons,
+            # Keep the remove button
+            ft.IconButton(
+                ft.icons.DELETE_OUTLINE,
+                tooltip="移除此适配器",
+                data=index,  # Store index to know which one to remove
+                on_click=remove_adapter,
+                icon_color=ft.colors.ERROR,
+            ),
+        ]
+
     def update_adapters_list():
         """Refreshes the list view with current adapter paths and status-dependent buttons."""
         adapters_list_view.controls.clear()
+        app_state.adapters_view_refs.clear()
         for index, path in enumerate(app_state.adapter_paths):
             # 使用与start_adapter_process相同的进程ID生成逻辑
             display_name = os.path.basename(path)
             process_id = f"adapter_{display_name.replace('.', '_')}"
-            
-            # 检查进程状态
-            process_state = app_state.managed_processes.get(process_id)
-            is_running = False
-            if (
-                process_state
-                and process_state.status == "running"
-                and process_state.pid
-                and psutil.pid_exists(process_state.pid)
-            ):
-                is_running = True
-
-            action_buttons = []
-            if is_running:
-                # If running: View Output Button and Stop Button
-                action_buttons.append(
-                    ft.IconButton(
-                        ft.icons.VISIBILITY_OUTLINED,
-                        tooltip="查看输出",
-                        data=process_id,  # 使用进程ID而非路径
-                        on_click=lambda e: page.go(f"/adapters/{e.control.data}"),
-                        icon_color=ft.colors.BLUE_GREY,  # Neutral color
-                    )
-                )
-                action_buttons.append(
-                    ft.IconButton(
-                        ft.icons.STOP_CIRCLE_OUTLINED,
-                        tooltip="停止此适配器",
-                        data=process_id,  # 使用进程ID而非路径
-                        # Call stop and then refresh the list view
-                        on_click=lambda e: (
-                            stop_managed_process(e.control.data, page, app_state),
-                            update_adapters_list(),
-                        ),
-                        icon_color=ft.colors.RED_ACCENT,
-                    )
-                )
-            else:
-                # If stopped: Start Button
-                action_buttons.append(
-                    ft.IconButton(
-                        ft.icons.PLAY_ARROW_OUTLINED,
-                        tooltip="启动此适配器脚本",
-                        data=path,  # 仍然需要传递路径以便正确启动
-                        on_click=lambda e: start_adapter_process(e, page, app_state),
-                        icon_color=ft.colors.GREEN,
-                    )
-                )
 
-            adapters_list_view.controls.append(
-                ft.Row(
-                    [
-                        ft.Text(path, expand=True, overflow=ft.TextOverflow.ELLIPSIS),
-                        # Add action buttons based on state
-                        *action_buttons,
-                        # Keep the remove button
-                        ft.IconButton(
-                            ft.icons.DELETE_OUTLINE,
-                            tooltip="移除此适配器",
-                            data=index,  # Store index to know which one to remove
-                            on_click=remove_adapter,
-                            icon_color=ft.colors.ERROR,
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                )
+            # row.data 保存重建本行控件的函数，进程停止时只需刷新这一行
+            row = ft.Row(
+                build_adapter_row_controls(index, path, process_id),
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                data=functools.partial(build_adapter_row_controls, index, path, process_id),
             )
+            adapters_list_view.controls.append(row)
+            app_state.adapters_view_refs[process_id] = row
         
         # 安全地更新UI - 添加判断确保控件已添加到页面
         print("[Adapters] 更新适配器列表，当前适配器数量:", len(app_state.adapter_paths))
@@ -781,7 +789,7 @@ def create_adapters_view(page: ft.Page, app_state: "AppState") -> ft.View:
             show_snackbar(page, "移除时发生错误：无效索引", error=True)
 
     # --- Start Adapter Process Handler --- #
-    def start_adapter_process(e, page: ft.Page, app_state: "AppState"):
+    async def start_adapter_process(e, page: ft.Page, app_state: "AppState"):
         """Handles the click event for the start adapter button."""
         path_to_run = e.control.data
         if not path_to_run or not isinstance(path_to_run, str):
@@ -798,7 +806,7 @@ def create_adapters_view(page: ft.Page, app_state: "AppState") -> ft.View:
 
         # Call the generic start function from process_manager
         # It will create the specific ListView in the state
-        success, message = start_managed_process(
+        success, message = await start_managed_process(
             script_path=path_to_run,
             type="adapter",
             display_name=display_name,
@@ -1015,7 +1023,7 @@ def create_process_output_view(page: ft.Page, app_state: "AppState", process_id:
             start_button = ft.ElevatedButton(
                 "启动适配器",
                 icon=ft.icons.PLAY_ARROW,
-                on_click=lambda _: start_adapter_from_view(adapter_path, page, app_state),
+                on_click=lambda _: page.run_task(start_adapter_from_view, adapter_path, page, app_state),
                 bgcolor=ft.colors.with_opacity(0.6, ft.colors.GREEN_ACCENT_100),
                 color=ft.colors.WHITE,
             )
@@ -1121,8 +1129,8 @@ def create_process_output_view(page: ft.Page, app_state: "AppState", process_id:
         stop_managed_process(process_id, page, app_state)
         _update_app_bar_and_buttons(page, view_app_bar)
 
-    def do_start_and_refresh(_):
-        start_adapter_from_view(process_state.script_path, page, app_state, process_id)
+    async def do_start_and_refresh(_):
+        await start_adapter_from_view(process_state.script_path, page, app_state, process_id)
         _update_app_bar_and_buttons(page, view_app_bar)
 
     # Determine initial state for button creation
@@ -1191,7 +1199,7 @@ def create_process_output_view(page: ft.Page, app_state: "AppState", process_id:
     )
 
 # --- 辅助函数 ---
-def start_adapter_from_view(script_path, page, app_state, existing_process_id=None):
+async def start_adapter_from_view(script_path, page, app_state, existing_process_id=None):
     """从详情视图中启动适配器"""
     # 导入依赖函数
     from .process_manager import start_managed_process
@@ -1205,7 +1213,7 @@ def start_adapter_from_view(script_path, page, app_state, existing_process_id=No
     print(f"[启动适配器] 从视图启动: {script_path}, process_id={process_id}")
     
     # 调用启动函数
-    success, message = start_managed_process(
+    success, message = await start_managed_process(
         script_path=script_path,
         type="adapter",
         display_name=display_name,
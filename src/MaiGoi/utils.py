@@ -1,8 +1,9 @@
 import flet as ft
 import os
 import sys
+import asyncio
 import subprocess
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, Callable, Any
 
 if TYPE_CHECKING:
     from .state import AppState  # Avoid circular import for type hinting
@@ -19,6 +20,25 @@ async def update_page_safe(page: Optional[ft.Page]):
             pass  # Silently ignore update errors, especially during shutdown
 
 
+def call_in_page_loop(page: Optional[ft.Page], callback: Callable[[], Any]):
+    """
+    Runs callback on the page's event loop. asyncio objects (e.g. asyncio.Event) are not
+    thread-safe, so calls from Flet's handler threads are marshalled via call_soon_threadsafe.
+    """
+    loop = getattr(page, "loop", None) if page else None
+    if loop is None or not loop.is_running():
+        callback()
+        return
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        callback()
+    else:
+        loop.call_soon_threadsafe(callback)
+
+
 def show_snackbar(page: Optional[ft.Page], message: str, error: bool = False):
     """Helper function to display a SnackBar."""
     if not page: